@@ -5,15 +5,53 @@ Process multiple YouTube videos in sequence
 """
 
 import argparse
+import hashlib
 import sys
 import os
-import json
+import glob
+import mmap
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
 import time
+from dataclasses import replace
 
-from config import Config, load_config_from_file
-from main import main as process_single_video
+from config import Config, load_config_from_file, json_dumps
+from main import run as process_single_video
+
+# Matches a YouTube URL at the start of a non-comment line; the shorter
+# youtu.be marker is tried first so short links match with less backtracking
+_URL_RE = re.compile(rb'(?m)^[ \t]*(https?://[^\s#]*(?:youtu\.be|youtube\.com)[^\s#]*)')
+
+# Extracts the canonical 11-character video ID from a YouTube URL
+_ID_RE = re.compile(r'(?:v=|youtu\.be/|/shorts/|/embed/)([A-Za-z0-9_-]{11})')
+
+
+def _default_workers() -> int:
+    """Pick a default worker count from the CPUs this process may run on."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity is Linux-only
+        cpus = os.cpu_count() or 2
+    return max(1, cpus // 2)
+
+
+def _cap_workers_by_memory(workers: int, config: Config) -> int:
+    """Cap parallelism so workers fit in available memory (config.memory_limit_mb each)."""
+    try:
+        import psutil
+        available_mb = psutil.virtual_memory().available // (1024 * 1024)
+    except ImportError:
+        try:
+            available_mb = (os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')) // (1024 * 1024)
+        except (AttributeError, OSError, ValueError):
+            # No way to probe memory on this platform; leave the count alone
+            return workers
+
+    return max(1, min(workers, available_mb // max(1, config.memory_limit_mb)))
 
 
 def parse_batch_arguments():
@@ -66,6 +104,13 @@ Examples:
         help="Minimum time between screenshots in seconds (default: 2.0)"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=_default_workers(),
+        help="Number of videos to process in parallel (default: half the usable CPU cores)"
+    )
+
     parser.add_argument(
         "--delay",
         type=float,
@@ -88,40 +133,65 @@ Examples:
     return parser.parse_args()
 
 
-def load_urls_from_file(file_path: str) -> List[str]:
-    """Load YouTube URLs from a text file."""
-    urls = []
-    
+def _iter_urls_from_file(file_path: str) -> Iterator[str]:
+    """Yield YouTube URLs from a text file with a single regex sweep."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Validate URL format
-                if not any(pattern in line for pattern in ['youtube.com', 'youtu.be']):
-                    print(f"Warning: Line {line_num} doesn't look like a YouTube URL: {line}")
-                    continue
-                
-                urls.append(line)
-        
-        return urls
-        
+        with open(file_path, 'rb') as f:
+            try:
+                # Scan the file bytes in place instead of line-by-line
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # mmap of an empty file is illegal; fall back to a plain read
+                buffer = f.read()
+
+            # The anchored pattern already skips comments and non-YouTube lines
+            for match in _URL_RE.finditer(buffer):
+                yield match.group(1).decode('utf-8')
+
     except FileNotFoundError:
         print(f"Error: URLs file not found: {file_path}")
-        return []
     except Exception as e:
         print(f"Error reading URLs file: {e}")
-        return []
+
+
+def load_urls_from_file(file_path: str) -> List[str]:
+    """Load YouTube URLs from a text file."""
+    # Thin wrapper for callers that need the count up front; streaming
+    # consumers can iterate _iter_urls_from_file directly
+    return list(_iter_urls_from_file(file_path))
+
+
+def deduplicate_urls(urls: Iterable[str]) -> List[str]:
+    """Drop URLs that point at the same video ID, keeping the first occurrence."""
+    seen = {}
+    for url in urls:
+        match = _ID_RE.search(url)
+        key = match.group(1) if match else url
+        seen.setdefault(key, url)
+    return list(seen.values())
+
+
+def _already_done(url: str, base_dir: str) -> bool:
+    """Check whether a previous run already produced output for this video."""
+    match = _ID_RE.search(url)
+    if not match:
+        return False
+
+    # _video_output_config names directories "*_<video_id>"; a run only
+    # counts as done once the rendered document exists, whatever format
+    # it was produced in
+    for dir_path in glob.glob(os.path.join(base_dir, f"*_{match.group(1)}")):
+        if glob.glob(os.path.join(dir_path, 'presentation.*')):
+            return True
+
+    return False
 
 
 def create_video_output_dir(base_dir: str, video_title: str, video_id: str) -> str:
     """Create a safe output directory name for a video."""
-    # Clean the title for use as directory name
-    safe_title = "".join(c for c in video_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    # Clean the title for use as directory name in one C-level translate pass
+    bad_chars = ''.join({c for c in video_title if not (c.isalnum() or c in ' -_')})
+    safe_title = video_title.translate(str.maketrans('', '', bad_chars)).rstrip()
     safe_title = safe_title[:50]  # Limit length
     
     # Create directory name
@@ -134,6 +204,76 @@ def create_video_output_dir(base_dir: str, video_title: str, video_id: str) -> s
     return dir_path
 
 
+def _log(message: str) -> None:
+    """Write a progress block with a single stdout write and flush."""
+    sys.stdout.write(message)
+    sys.stdout.flush()
+
+
+def _video_output_config(url: str, config: Config) -> Config:
+    """Route one video's output into its own directory under the base dir.
+
+    Workers run concurrently; sharing output_directory would interleave
+    screenshots, transcripts, caches and the rendered document across
+    videos (and serially each video overwrote the last). The title is not
+    known before download, so the directory is named from the video ID,
+    which also lets _already_done recognize the output on later runs.
+    """
+    match = _ID_RE.search(url)
+    video_id = match.group(1) if match else hashlib.blake2b(
+        url.encode(), digest_size=8).hexdigest()
+    dir_path = create_video_output_dir(config.output_directory, "video", video_id)
+    return replace(config, output_directory=dir_path)
+
+
+def _process_one(url: str, config: Config) -> str:
+    """Process a single video inside a worker process."""
+    process_single_video(url, _video_output_config(url, config))
+    return url
+
+
+def _process_batch_parallel(urls: List[str], config: Config, results: Dict, args) -> Dict:
+    """Process videos in parallel across worker processes."""
+    print(f"Processing {len(urls)} videos with {args.workers} workers")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(_process_one, url, config): (i, url)
+            for i, url in enumerate(urls, 1)
+        }
+
+        try:
+            for future in as_completed(futures):
+                i, url = futures[future]
+
+                try:
+                    future.result()
+                    results['successful'] += 1
+                    # One write per completion keeps racing workers from interleaving
+                    _log(f"✓ [{results['successful'] + results['failed']}/{len(urls)}] Completed: {url}\n")
+                except Exception as e:
+                    error_msg = f"Failed to process video {i}: {str(e)}"
+                    _log(f"✗ {error_msg}\n")
+                    results['errors'].append({
+                        'url': url,
+                        'index': i,
+                        'error': str(e)
+                    })
+                    results['failed'] += 1
+
+                    if not args.continue_on_error:
+                        print("Stopping batch processing due to error")
+                        for pending in futures:
+                            pending.cancel()
+                        break
+        except KeyboardInterrupt:
+            print("\nBatch processing interrupted by user")
+            for pending in futures:
+                pending.cancel()
+
+    return results
+
+
 def process_video_batch(urls: List[str], config: Config, args) -> Dict:
     """Process a batch of videos."""
     results = {
@@ -142,76 +282,66 @@ def process_video_batch(urls: List[str], config: Config, args) -> Dict:
         'failed': 0,
         'errors': []
     }
-    
+
     print(f"Starting batch processing of {len(urls)} videos")
     print("=" * 60)
-    
+
+    # Videos are independent, so spread them across worker processes
+    if args.workers > 1 and len(urls) > 1:
+        return _process_batch_parallel(urls, config, results, args)
+
     for i, url in enumerate(urls, 1):
-        print(f"\n[{i}/{len(urls)}] Processing: {url}")
-        print("-" * 40)
-        
+        # Coalesce the per-video banner into a single stdout write
+        _log(f"\n[{i}/{len(urls)}] Processing: {url}\n" + "-" * 40 + "\n")
+
+        # Start the inter-video delay now so it counts down while the video
+        # itself is processed instead of as dead time afterwards
+        delay_done = threading.Event()
+        if args.delay > 0:
+            delay_timer = threading.Timer(args.delay, delay_done.set)
+            delay_timer.daemon = True
+            delay_timer.start()
+        else:
+            delay_done.set()
+
         try:
-            # Create temporary sys.argv for the single video processor
-            original_argv = sys.argv.copy()
-            
-            # Build command line arguments for single video processing
-            single_args = [
-                'main.py',
-                url,
-                '--output-dir', args.output_dir,
-                '--format', args.format,
-                '--sensitivity', str(args.sensitivity),
-                '--min-time', str(args.min_time)
-            ]
-            
-            if args.config:
-                single_args.extend(['--config', args.config])
-            
-            if args.verbose:
-                single_args.append('--verbose')
-            
-            # Temporarily replace sys.argv
-            sys.argv = single_args
-            
-            # Process the video
-            process_single_video()
-            
+            # Process the video into its own per-video output directory
+            process_single_video(url, _video_output_config(url, config))
+
             results['successful'] += 1
-            print(f"✓ Successfully processed video {i}")
-            
+            _log(f"✓ Successfully processed video {i}\n")
+
         except KeyboardInterrupt:
             print("\nBatch processing interrupted by user")
             break
         except Exception as e:
             error_msg = f"Failed to process video {i}: {str(e)}"
-            print(f"✗ {error_msg}")
+            _log(f"✗ {error_msg}\n")
             results['errors'].append({
                 'url': url,
                 'index': i,
                 'error': str(e)
             })
             results['failed'] += 1
-            
+
             if not args.continue_on_error:
                 print("Stopping batch processing due to error")
                 break
-        
-        # Delay between videos (except for the last one)
-        if i < len(urls) and args.delay > 0:
-            print(f"Waiting {args.delay} seconds before next video...")
-            time.sleep(args.delay)
-        
-        # Restore original sys.argv
-        sys.argv = original_argv
-    
+
+        # Delay between videos (except for the last one); usually already
+        # elapsed because the timer ran during processing
+        if i < len(urls) and not delay_done.is_set():
+            _log(f"Waiting out the {args.delay} second inter-video delay...\n")
+            delay_done.wait()
+
     return results
 
 
 def save_batch_results(results: Dict, output_file: str):
     """Save batch processing results to a JSON file."""
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(json_dumps(results))
         print(f"\nBatch results saved to: {output_file}")
     except Exception as e:
         print(f"Warning: Could not save batch results: {e}")
@@ -223,24 +353,46 @@ def main():
     
     # Load URLs from file
     urls = load_urls_from_file(args.urls_file)
-    
+
     if not urls:
         print("No valid URLs found. Exiting.")
         sys.exit(1)
+
+    # Don't redo work: drop duplicate video IDs and already-completed videos
+    unique_urls = deduplicate_urls(urls)
+    if len(unique_urls) < len(urls):
+        print(f"Skipping {len(urls) - len(unique_urls)} duplicate URLs")
+
+    urls = [url for url in unique_urls if not _already_done(url, args.output_dir)]
+    if len(urls) < len(unique_urls):
+        print(f"Skipping {len(unique_urls) - len(urls)} already-processed videos")
+
+    if not urls:
+        print("All URLs already processed. Exiting.")
+        sys.exit(0)
     
     # Load configuration
     config = Config()
     if args.config:
         config = load_config_from_file(args.config)
-    
+
     # Override config with batch arguments
-    config.output_directory = args.output_dir
-    config.output_format = args.format.upper()
-    config.scene_change_threshold = args.sensitivity
-    config.min_time_between_captures = args.min_time
+    config = replace(
+        config,
+        output_directory=args.output_dir,
+        output_format=args.format.upper(),
+        scene_change_threshold=args.sensitivity,
+        min_time_between_captures=args.min_time
+    )
     
+    # Keep N workers x memory_limit_mb within the memory actually available
+    capped_workers = _cap_workers_by_memory(args.workers, config)
+    if capped_workers < args.workers:
+        print(f"Reducing workers from {args.workers} to {capped_workers} to fit memory limits")
+        args.workers = capped_workers
+
     # Ensure base output directory exists
-    os.makedirs(args.output_dir, exist_ok=True)
+    config.ensure_dirs()
     
     print("YouTube Presentation Extractor - Batch Processor")
     print("=" * 60)
@@ -248,6 +400,7 @@ def main():
     print(f"Total URLs: {len(urls)}")
     print(f"Output directory: {args.output_dir}")
     print(f"Format: {args.format}")
+    print(f"Workers: {args.workers}")
     print(f"Continue on error: {args.continue_on_error}")
     print("-" * 60)
     
@@ -2,18 +2,46 @@
 Configuration settings for YouTube Presentation Extractor
 """
 
+import functools
+import json
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, Optional
 
-@dataclass
+# Prefer orjson's C encoder when available; fall back to the stdlib
+try:
+    import orjson
+
+    def json_dumps(obj) -> bytes:
+        """Serialize an object to indented JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    def json_loads(data):
+        """Parse JSON from bytes or string."""
+        return orjson.loads(data)
+
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        """Serialize an object to indented JSON bytes."""
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+    def json_loads(data):
+        """Parse JSON from bytes or string."""
+        return json.loads(data)
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Configuration class for the YouTube presentation extractor."""
+    """Immutable configuration for the YouTube presentation extractor.
+
+    Instances are frozen so they can be shared safely across batch worker
+    processes; derive variants with dataclasses.replace.
+    """
     
     # Scene detection settings
     scene_change_threshold: float = 0.5  # SSIM threshold for scene changes
     min_time_between_captures: float = 5.0  # Minimum seconds between screenshots
     histogram_threshold: float = 0.25  # Histogram comparison threshold
+    scene_detect_scale: float = 0.25  # Downscale factor applied to frames before comparison
     
     # Video processing settings
     target_resolution: Optional[tuple] = None  # (width, height) or None for original
@@ -26,6 +54,7 @@ class Config:
     screenshot_format: str = "PNG"
     screenshot_quality: int = 95  # For JPEG format
     screenshot_resolution: Optional[tuple] = None  # (width, height) for screenshot resizing
+    screenshot_max_width: int = 1280  # Downscale wider frames before saving screenshots
     output_directory: str = "output"
     
     # Document generation settings
@@ -38,15 +67,24 @@ class Config:
     enable_llm_enhancement: bool = False  # Enable/disable LLM enhancement
     enhancement_level: str = "detailed"  # basic, detailed, academic
     anthropic_model: str = "claude-3-7-sonnet-20250219"  # Claude model to use
+    basic_model: str = "claude-3-5-haiku-latest"  # Cheaper model for basic enhancement and summary calls
+    basic_model_input_price: float = 0.8  # USD per million input tokens for basic_model
+    basic_model_output_price: float = 4.0  # USD per million output tokens for basic_model
     max_tokens_per_request: int = 4000  # Max tokens per API request (increased for larger context)
     max_cost_per_video: float = 5.0  # Maximum cost per video in USD
+    model_input_price: float = 3.0  # USD per million input tokens
+    model_output_price: float = 15.0  # USD per million output tokens
     cache_enhanced_results: bool = True  # Cache enhancement results
-    cache_file: str = "enhancement_cache.json"  # Cache file path
+    cache_file: str = "enhancement_cache.db"  # SQLite cache file (one row per enhanced batch)
+    cache_max_entries: int = 4096  # LRU cap on in-memory cache entries (0 = unbounded)
+    summarization_threshold_tokens: int = 16000  # Split key-point extraction above this prompt size (0 = never)
     
     # LLM Batching settings
     batch_target_tokens: int = 1500  # Target tokens per batch (will result in ~700-1000 tokens of actual text)
     enable_batching: bool = True  # Enable batching for transcript enhancement
     batch_overlap_tolerance: float = 0.2  # Allow 20% overlap in batch sizes
+    max_concurrent_requests: int = 4  # Concurrent Claude requests during batch enhancement
+    use_message_batches: bool = False  # Route enhancement through the Message Batches API (half cost, minutes of latency)
     
     # LLM Prompt customization
     custom_prompt_template: Optional[str] = None  # Custom prompt template (optional)
@@ -59,40 +97,52 @@ class Config:
     # Performance settings
     chunk_size: int = 100  # Frames to process in chunks
     memory_limit_mb: int = 512  # Memory limit for processing
+    download_workers: int = 8  # Parallel yt-dlp fragment downloads (0 = yt-dlp default)
+    extraction_workers: int = 1  # Frame-extraction threads (1 = streaming single decoder)
     
     def __post_init__(self):
-        """Ensure output directory exists and set default resolutions."""
-        os.makedirs(self.output_directory, exist_ok=True)
-        
-        # Set default screenshot resolution if not specified
+        """Set the default screenshot resolution if not specified."""
         if self.screenshot_resolution is None:
+            # object.__setattr__ is the sanctioned escape hatch for frozen
+            # dataclass initialization
             if self.target_resolution:
-                self.screenshot_resolution = self.target_resolution
+                object.__setattr__(self, 'screenshot_resolution', self.target_resolution)
             else:
                 # Default to 1280x720 for screenshots
-                self.screenshot_resolution = (1280, 720)
+                object.__setattr__(self, 'screenshot_resolution', (1280, 720))
+
+    def ensure_dirs(self) -> None:
+        """Create the output directory if it does not exist yet."""
+        # Skip the mkdir syscall when the directory is already there
+        if not os.path.isdir(self.output_directory):
+            os.makedirs(self.output_directory, exist_ok=True)
 
 # Default configuration
 DEFAULT_CONFIG = Config()
 
+@functools.lru_cache(maxsize=8)
+def _load_config_dict(config_path: str, mtime: float) -> Dict:
+    """Parse a config file once per (path, mtime) combination."""
+    with open(config_path, 'rb') as f:
+        config_dict = json_loads(f.read())
+
+    # Convert tuple strings back to tuples
+    if 'target_resolution' in config_dict and config_dict['target_resolution']:
+        config_dict['target_resolution'] = tuple(config_dict['target_resolution'])
+
+    if 'screenshot_resolution' in config_dict and config_dict['screenshot_resolution']:
+        config_dict['screenshot_resolution'] = tuple(config_dict['screenshot_resolution'])
+
+    return config_dict
+
 def load_config_from_file(config_path: str) -> Config:
-    """Load configuration from a JSON file."""
-    import json
-    
+    """Load configuration from a JSON file, reusing the parsed result until the file changes."""
     if not os.path.exists(config_path):
         return DEFAULT_CONFIG
-    
+
     try:
-        with open(config_path, 'r') as f:
-            config_dict = json.load(f)
-        
-        # Convert tuple strings back to tuples
-        if 'target_resolution' in config_dict and config_dict['target_resolution']:
-            config_dict['target_resolution'] = tuple(config_dict['target_resolution'])
-        
-        if 'screenshot_resolution' in config_dict and config_dict['screenshot_resolution']:
-            config_dict['screenshot_resolution'] = tuple(config_dict['screenshot_resolution'])
-        
+        config_dict = _load_config_dict(config_path, os.path.getmtime(config_path))
+        # Build a fresh instance so callers can mutate it without touching the cache
         return Config(**config_dict)
     except Exception as e:
         print(f"Warning: Could not load config from {config_path}: {e}")
@@ -100,63 +150,32 @@ def load_config_from_file(config_path: str) -> Config:
 
 def save_config_to_file(config: Config, config_path: str):
     """Save configuration to a JSON file."""
-    import json
-    
-    config_dict = {
-        'scene_change_threshold': config.scene_change_threshold,
-        'min_time_between_captures': config.min_time_between_captures,
-        'histogram_threshold': config.histogram_threshold,
-        'target_resolution': config.target_resolution,
-        'video_quality': config.video_quality,
-        'frame_rate': config.frame_rate,
-        'skip_intro_outro': config.skip_intro_outro,
-        'intro_outro_duration': config.intro_outro_duration,
-        'screenshot_format': config.screenshot_format,
-        'screenshot_quality': config.screenshot_quality,
-        'screenshot_resolution': config.screenshot_resolution,
-        'output_directory': config.output_directory,
-        'output_format': config.output_format,
-        'template_name': config.template_name,
-        'include_timestamps': config.include_timestamps,
-        'include_navigation': config.include_navigation,
-        'enable_llm_enhancement': config.enable_llm_enhancement,
-        'enhancement_level': config.enhancement_level,
-        'anthropic_model': config.anthropic_model,
-        'max_tokens_per_request': config.max_tokens_per_request,
-        'max_cost_per_video': config.max_cost_per_video,
-        'cache_enhanced_results': config.cache_enhanced_results,
-        'cache_file': config.cache_file,
-        'batch_target_tokens': config.batch_target_tokens,
-        'enable_batching': config.enable_batching,
-        'batch_overlap_tolerance': config.batch_overlap_tolerance,
-        'custom_prompt_template': config.custom_prompt_template,
-        'prompt_style': config.prompt_style,
-        'max_retries': config.max_retries,
-        'timeout': config.timeout,
-        'chunk_size': config.chunk_size,
-        'memory_limit_mb': config.memory_limit_mb
-    }
-    
+    # asdict walks the dataclass fields, so new fields are never dropped
+    config_dict = asdict(config)
+
     try:
-        with open(config_path, 'w') as f:
-            json.dump(config_dict, f, indent=2)
+        with open(config_path, 'wb') as f:
+            f.write(json_dumps(config_dict))
     except Exception as e:
         print(f"Warning: Could not save config to {config_path}: {e}")
 
+# Common resolution presets (constant, built once at import)
+RESOLUTION_PRESETS = {
+    '144p': (256, 144),
+    '240p': (426, 240),
+    '360p': (640, 360),
+    '480p': (854, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '1440p': (2560, 1440),
+    '2160p': (3840, 2160),
+    '4k': (3840, 2160),
+    'hd': (1280, 720),
+    'fullhd': (1920, 1080),
+    'qhd': (2560, 1440),
+    'uhd': (3840, 2160)
+}
+
 def get_resolution_presets():
     """Get common resolution presets."""
-    return {
-        '144p': (256, 144),
-        '240p': (426, 240),
-        '360p': (640, 360),
-        '480p': (854, 480),
-        '720p': (1280, 720),
-        '1080p': (1920, 1080),
-        '1440p': (2560, 1440),
-        '2160p': (3840, 2160),
-        '4k': (3840, 2160),
-        'hd': (1280, 720),
-        'fullhd': (1920, 1080),
-        'qhd': (2560, 1440),
-        'uhd': (3840, 2160)
-    } 
\ No newline at end of file
+    return RESOLUTION_PRESETS 
\ No newline at end of file
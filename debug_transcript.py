@@ -15,6 +15,9 @@ from document_generator import DocumentGenerator, PresentationSlide
 from config import Config
 from scene_detector import SceneChange
 
+# Subtitle file extensions to look for in the output directory
+SUBTITLE_EXTS = ('.srt', '.vtt', '.json')
+
 def debug_transcript_extraction():
     """Debug transcript extraction for a specific video."""
     
@@ -91,10 +94,12 @@ def debug_transcript_extraction():
     print("\n=== Testing Transcript Parser Methods ===")
     
     # Load subtitles from the output directory
-    subtitle_files = []
-    for file in os.listdir("output"):
-        if file.endswith(('.srt', '.vtt', '.json')):
-            subtitle_files.append(os.path.join("output", file))
+    # scandir reuses the directory entry type info, avoiding a stat per file
+    with os.scandir("output") as it:
+        subtitle_files = [
+            entry.path for entry in it
+            if entry.is_file(follow_symlinks=False) and entry.name.endswith(SUBTITLE_EXTS)
+        ]
     
     if subtitle_files:
         print(f"Found subtitle files: {subtitle_files}")
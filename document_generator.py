@@ -3,35 +3,263 @@ Document generator module for YouTube Presentation Extractor
 Creates HTML, Markdown, and PDF documents with screenshots and transcripts
 """
 
+import bisect
+import functools
+import io
 import os
 import cv2
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
+from itertools import chain, islice
 import jinja2
+import numpy as np
 import re
 
 from config import Config
 from scene_detector import SceneChange
 from transcript_parser import TranscriptParser
 
+@functools.lru_cache(maxsize=1024)
+def _strip_markdown(text: str) -> str:
+    """Strip markdown formatting in a single left-to-right scan.
 
-@dataclass
+    Handles headers, list bullets, bold/italic, inline and fenced code, and
+    links without regex passes: each delimiter is resolved with str.find and
+    the matching closer is remembered in pending_close, so nested markup
+    unwraps naturally while the text is only walked once. Whitespace
+    normalization is part of the same pass: space runs collapse to one space
+    and whitespace-only line runs collapse to one blank line, so no trailing
+    cleanup passes are needed.
+    """
+    out = []
+    append = out.append
+    find = text.find
+    n = len(text)
+    i = 0
+    line_start = True
+    pending_close = {}  # position -> closing delimiter length to skip
+
+    while i < n:
+        if i in pending_close:
+            i += pending_close.pop(i)
+            line_start = False
+            continue
+
+        ch = text[i]
+
+        if ch == '\n':
+            # Collapse a whitespace run containing more newlines into one
+            # blank line
+            j = i + 1
+            while j < n and text[j] in ' \t\n':
+                j += 1
+            last_nl = text.rfind('\n', i + 1, j)
+            if last_nl != -1:
+                append('\n\n')
+                i = last_nl + 1
+            else:
+                append('\n')
+                i += 1
+            line_start = True
+            continue
+
+        if line_start:
+            # Drop header hashes, list bullets and ordered-list numbers
+            # (with their indentation) at the start of a line
+            j = i
+            while j < n and text[j] in ' \t':
+                j += 1
+            marker_end = None
+            if j < n:
+                c = text[j]
+                if c == '#':
+                    k = j
+                    while k < n and text[k] == '#':
+                        k += 1
+                    if k - j <= 6 and k < n and text[k] in ' \t':
+                        marker_end = k + 1
+                elif c in '-*+' and j + 1 < n and text[j + 1] in ' \t':
+                    marker_end = j + 2
+                elif c.isdigit():
+                    k = j
+                    while k < n and text[k].isdigit():
+                        k += 1
+                    if k + 1 < n and text[k] == '.' and text[k + 1] in ' \t':
+                        marker_end = k + 2
+            line_start = False
+            if marker_end is not None:
+                i = marker_end
+                continue
+
+        if ch == ' ':
+            j = i + 1
+            while j < n and text[j] == ' ':
+                j += 1
+            append(' ')
+            i = j
+            continue
+
+        if ch == '`':
+            if text.startswith('```', i):
+                end = find('```', i + 3)
+                if end != -1:
+                    # Fenced code blocks are dropped entirely
+                    i = end + 3
+                    continue
+            else:
+                end = find('`', i + 1)
+                if end != -1:
+                    pending_close[end] = 1
+                    i += 1
+                    continue
+            append(ch)
+            i += 1
+            continue
+
+        if ch == '*' or ch == '_':
+            if i + 1 < n and text[i + 1] == ch:
+                delim = ch + ch
+                start = i + 2
+            else:
+                delim = ch
+                start = i + 1
+            end = find(delim, start)
+            if end != -1:
+                pending_close[end] = len(delim)
+                i = start
+                continue
+            append(ch)
+            i += 1
+            continue
+
+        if ch == '[':
+            mid = find('](', i + 1)
+            if mid != -1 and mid > i + 1 and ']' not in text[i + 1:mid]:
+                end = find(')', mid + 2)
+                if end != -1:
+                    # Skip the opening bracket now and the "](url)" tail when
+                    # we reach it; the label in between is scanned normally
+                    pending_close[mid] = end - mid + 1
+                    i += 1
+                    continue
+            append(ch)
+            i += 1
+            continue
+
+        append(ch)
+        i += 1
+
+    return ''.join(out).strip()
+
+# Cap on encoded screenshot bytes kept in memory for PDF generation; beyond
+# this the PDF path falls back to reading from disk
+_SCREENSHOT_CACHE_LIMIT = 256 * 1024 * 1024
+
+# Flush the enhancement cache to disk after this many completed batches so a
+# crash mid-run does not discard paid LLM work
+_CACHE_FLUSH_INTERVAL = 5
+
+# Minimal stand-in segment for feeding combined batch text to the enhancer
+_Segment = namedtuple('Segment', ['text'])
+
+# Sentence boundary: terminator kept with its sentence, so splits never have
+# to re-append punctuation
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+def _segment_range_lookup(segments):
+    """Build a bisect-backed (start, end) -> overlapping-segments callable.
+
+    Subtitle segments are time-ordered by start, but a long cue spanning
+    several short ones leaves the end times unsorted — so the binary search
+    runs over the running maximum of the end times, which is sorted by
+    construction: everything before its crossing index has already ended
+    (the same trick as transcript_parser._time_index). The walk stops at
+    the first segment starting past the window and re-checks each candidate
+    exactly — O(log N + K) per lookup instead of a full scan. The last
+    window's result is memoized for back-to-back repeats.
+    """
+    end_maxes = []
+    running = float('-inf')
+    for s in segments:
+        if s.end_time > running:
+            running = s.end_time
+        end_maxes.append(running)
+    n = len(segments)
+    last = {}
+
+    def lookup(start_time: float, end_time: float) -> list:
+        key = (start_time, end_time)
+        cached = last.get(key)
+        if cached is not None:
+            return cached
+        lo = bisect.bisect_left(end_maxes, start_time)
+        in_range = []
+        while lo < n and segments[lo].start_time <= end_time:
+            if segments[lo].end_time >= start_time:
+                in_range.append(segments[lo])
+            lo += 1
+        last.clear()
+        last[key] = in_range
+        return in_range
+
+    return lookup
+
+
+def _md_slide_enhanced(slide, header: str) -> str:
+    """Render one Markdown slide section with enhanced transcript."""
+    key_points = ""
+    if slide.key_points:
+        points = "".join(f"- {point}\n" for point in slide.key_points)
+        key_points = f"**Key Points:**\n\n{points}\n"
+    original = ""
+    if slide.transcript_text:
+        original = (f"<details>\n<summary>Original Transcript</summary>\n\n"
+                    f"{slide.transcript_text}\n\n</details>\n\n")
+    return (f"{header}![Slide {slide.slide_number}]({slide.screenshot_path})\n\n"
+            f"**Enhanced Transcript:**\n\n{slide.enhanced_text}\n\n"
+            f"{key_points}{original}---\n\n")
+
+
+def _md_slide_plain(slide, header: str) -> str:
+    """Render one Markdown slide section with the original transcript."""
+    if slide.transcript_text:
+        body = f"**Transcript:**\n\n{slide.transcript_text}\n\n"
+    else:
+        body = "*No transcript available for this slide.*\n\n"
+    return (f"{header}![Slide {slide.slide_number}]({slide.screenshot_path})\n\n"
+            f"{body}---\n\n")
+
+
+@dataclass(slots=True)
 class PresentationSlide:
-    """Represents a slide with screenshot and transcript."""
+    """Represents a slide with screenshot and transcript.
+
+    Slotted because long videos create thousands of instances; fixed-offset
+    attribute access is also faster in the render loops.
+    """
     timestamp: float
     screenshot_path: str
     transcript_text: str
     slide_number: int
     enhanced_text: str = ""  # Enhanced version of transcript
-    key_points: List[str] = None  # Key points for this slide
+    key_points: List[str] = field(default_factory=list)  # Key points for this slide
     summary: str = ""  # Summary of this slide
-    
+    has_enhancement: bool = False  # True when enhanced_text differs from the original
+
     def __post_init__(self):
-        """Initialize default values for enhanced fields."""
-        if self.key_points is None:
-            self.key_points = []
+        """Derive the enhancement flag once at construction time.
+
+        Writers branch on the precomputed flag instead of repeating the
+        string comparison per slide; str equality bails on length mismatch
+        before comparing bytes, so no separate length check is needed.
+        """
+        self.has_enhancement = bool(self.enhanced_text and
+                                    self.enhanced_text != self.transcript_text)
 
 
 class DocumentGenerator:
@@ -44,12 +272,23 @@ class DocumentGenerator:
         self.video_duration = 0.0
         self.output_path = None  # Store the output path for screenshot directory
         self.enhancement_stats = {}  # Store enhancement statistics
+        self._screenshot_bytes = {}  # Encoded screenshots, keyed by relative path
+        self._out_dir = Path(config.output_directory)  # Output dir resolved once
         
-        # Setup Jinja2 environment for HTML templates
+        # Setup Jinja2 environment for HTML templates. The bytecode cache
+        # persists compiled templates across runs, and auto_reload=False
+        # skips the mtime check Jinja2 would otherwise do per lookup
+        os.makedirs(os.path.join('templates', '.jinja_cache'), exist_ok=True)
         self.jinja_env = jinja2.Environment(
             loader=jinja2.FileSystemLoader('templates'),
-            autoescape=True
+            autoescape=True,
+            auto_reload=False,
+            bytecode_cache=jinja2.FileSystemBytecodeCache(os.path.join('templates', '.jinja_cache'))
         )
+
+        # Compile the presentation template once and reuse it per document
+        self._create_html_template()
+        self._presentation_template = self.jinja_env.get_template('presentation.html')
     
     def create_presentation(self, 
                           scene_changes: List[SceneChange],
@@ -74,7 +313,7 @@ class DocumentGenerator:
         self.video_duration = video_duration
         
         # Store output path for screenshot directory creation
-        self.output_path = os.path.join(self.config.output_directory, output_filename)
+        self.output_path = str(self._out_dir / output_filename)
         
         print("Generating presentation document...")
         
@@ -101,7 +340,19 @@ class DocumentGenerator:
         
         # Define time limit per slide (in seconds) to control text length
         time_limit_per_slide = 300.0  # 5 minutes per slide (increased from 2 minutes)
-        
+
+        # Bind hot callables to locals to cut attribute lookups in the loop
+        clean_text = transcript_parser.clean_text
+        remove_markdown = self._remove_markdown_formatting
+
+        # Bisect-backed window lookup instead of scanning every segment per
+        # sub-slide window (O(slides * segments))
+        get_segments_in_range = _segment_range_lookup(transcript_parser.segments)
+
+        # Forward slashes are fine in HTML/Markdown and for cv2, and the
+        # f-string avoids os.path.join's argument walking in the loop
+        ext = self.config.screenshot_format.lower()
+
         for i, change in enumerate(scene_changes):
             # Determine the time range for this scene change
             if i == 0:
@@ -125,44 +376,33 @@ class DocumentGenerator:
                 slide_end_time = min(current_time + time_limit_per_slide, end_time)
                 
                 # Get all segments within this slide's time range
-                segments_in_range = transcript_parser.get_segments_in_range(current_time, slide_end_time)
-                
+                segments_in_range = get_segments_in_range(current_time, slide_end_time)
+
                 if segments_in_range:  # Only create slide if there are segments
                     # Combine transcript text from all segments in this range
-                    transcript_texts = []
-                    enhanced_texts = []
-                    all_key_points = []
-                    
-                    for segment in segments_in_range:
-                        # Add original text
-                        if segment.text:
-                            transcript_texts.append(segment.text)
-                        
-                        # Add enhanced text if available
-                        if segment.enhanced_text and segment.enhanced_text != segment.text:
-                            enhanced_texts.append(segment.enhanced_text)
-                        else:
-                            enhanced_texts.append(segment.text)
-                        
-                        # Add key points
-                        all_key_points.extend(segment.key_points)
-                    
+                    transcript_texts = [s.text for s in segments_in_range if s.text]
+                    enhanced_texts = [
+                        s.enhanced_text if (s.enhanced_text and s.enhanced_text != s.text) else s.text
+                        for s in segments_in_range
+                    ]
+                    all_key_points = list(chain.from_iterable(s.key_points for s in segments_in_range))
+
                     # Combine all texts
                     transcript_text = " ".join(transcript_texts)
                     enhanced_text = " ".join(enhanced_texts)
-                    
+
                     # Clean the texts and remove markdown formatting
                     if transcript_text:
-                        transcript_text = transcript_parser.clean_text(transcript_text)
+                        transcript_text = clean_text(transcript_text)
                     if enhanced_text:
-                        enhanced_text = transcript_parser.clean_text(enhanced_text)
+                        enhanced_text = clean_text(enhanced_text)
                         # Remove markdown formatting from enhanced text
-                        enhanced_text = self._remove_markdown_formatting(enhanced_text)
+                        enhanced_text = remove_markdown(enhanced_text)
                     
                     # Create slide
                     slide = PresentationSlide(
                         timestamp=current_time,
-                        screenshot_path=os.path.join('pics', f"screenshot_{i+1:03d}.{self.config.screenshot_format.lower()}"),
+                        screenshot_path=f"pics/screenshot_{i+1:03d}.{ext}",
                         transcript_text=transcript_text,
                         slide_number=slide_number,
                         enhanced_text=enhanced_text,
@@ -179,12 +419,6 @@ class DocumentGenerator:
     
     def _generate_html_document(self, output_filename: str) -> str:
         """Generate HTML presentation document."""
-        # Ensure templates directory exists
-        os.makedirs('templates', exist_ok=True)
-        
-        # Create HTML template if it doesn't exist
-        self._create_html_template()
-        
         # Prepare template data
         template_data = {
             'title': self.video_title,
@@ -196,86 +430,69 @@ class DocumentGenerator:
             'include_navigation': self.config.include_navigation
         }
         
-        # Render template
-        template = self.jinja_env.get_template('presentation.html')
-        html_content = template.render(**template_data)
+        # Render the cached template
+        html_content = self._presentation_template.render(**template_data)
         
         # Write to file
-        output_path = os.path.join(self.config.output_directory, output_filename)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
+        output_path = str(self._out_dir / output_filename)
+        Path(output_path).write_text(html_content, encoding='utf-8')
+
         print(f"Generated HTML presentation: {output_path}")
         return output_path
     
     def _generate_markdown_document(self, output_filename: str) -> str:
         """Generate Markdown presentation document."""
-        output_path = os.path.join(self.config.output_directory, output_filename)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write(f"# {self.video_title}\n\n")
-            f.write(f"*Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
-            f.write(f"**Video Duration:** {self._format_duration(self.video_duration)}\n")
-            f.write(f"**Total Slides:** {len(self.slides)}\n\n")
-            
-            # Add enhancement info if available
-            enhanced_slides = [s for s in self.slides if s.enhanced_text and s.enhanced_text != s.transcript_text]
-            if enhanced_slides:
-                f.write(f"**Enhanced Content:** {len(enhanced_slides)} slides have AI-enhanced transcripts\n\n")
-            
-            # Write table of contents
-            if self.config.include_navigation:
-                f.write("## Table of Contents\n\n")
-                for slide in self.slides:
-                    timestamp_str = self._format_timestamp(slide.timestamp)
-                    f.write(f"- [Slide {slide.slide_number} ({timestamp_str})](#slide-{slide.slide_number})\n")
-                f.write("\n---\n\n")
-            
-            # Write slides
-            for slide in self.slides:
-                f.write(f"## Slide {slide.slide_number}\n\n")
-                
-                if self.config.include_timestamps:
-                    timestamp_str = self._format_timestamp(slide.timestamp)
-                    f.write(f"**Timestamp:** {timestamp_str}\n\n")
-                
-                # Reference the screenshot image
-                f.write(f"![Slide {slide.slide_number}]({slide.screenshot_path})\n\n")
-                
-                # Add enhanced transcript if available
-                if slide.enhanced_text and slide.enhanced_text != slide.transcript_text:
-                    f.write("**Enhanced Transcript:**\n\n")
-                    f.write(f"{slide.enhanced_text}\n\n")
-                    
-                    # Add key points if available
-                    if slide.key_points:
-                        f.write("**Key Points:**\n\n")
-                        for point in slide.key_points:
-                            f.write(f"- {point}\n")
-                        f.write("\n")
-                    
-                    # Add original transcript as reference
-                    if slide.transcript_text:
-                        f.write("<details>\n<summary>Original Transcript</summary>\n\n")
-                        f.write(f"{slide.transcript_text}\n\n")
-                        f.write("</details>\n\n")
-                else:
-                    # Add original transcript
-                    if slide.transcript_text:
-                        f.write("**Transcript:**\n\n")
-                        f.write(f"{slide.transcript_text}\n\n")
-                    else:
-                        f.write("*No transcript available for this slide.*\n\n")
-                
-                f.write("---\n\n")
-        
+        output_path = str(self._out_dir / output_filename)
+
+        # Accumulate chunks and write the document in one shot; one write
+        # call is much cheaper than dozens of small ones per slide
+        parts = []
+
+        # Write header
+        parts.append(f"# {self.video_title}\n\n")
+        parts.append(f"*Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
+        parts.append(f"**Video Duration:** {self._format_duration(self.video_duration)}\n")
+        parts.append(f"**Total Slides:** {len(self.slides)}\n\n")
+
+        # Add enhancement info if available
+        enhanced_slides = [s for s in self.slides if s.has_enhancement]
+        if enhanced_slides:
+            parts.append(f"**Enhanced Content:** {len(enhanced_slides)} slides have AI-enhanced transcripts\n\n")
+
+        # Format every slide timestamp in one vectorized pass; the TOC and
+        # slide sections below index into the result
+        timestamp_strs = self._format_timestamps_batch([s.timestamp for s in self.slides])
+
+        # Write table of contents
+        if self.config.include_navigation:
+            parts.append("## Table of Contents\n\n")
+            parts.append("".join(
+                f"- [Slide {slide.slide_number} ({timestamp_str})](#slide-{slide.slide_number})\n"
+                for slide, timestamp_str in zip(self.slides, timestamp_strs)
+            ))
+            parts.append("\n---\n\n")
+
+        # Write slides; each slide renders to one string via the module-level
+        # formatters instead of a dozen conditional appends
+        include_timestamps = self.config.include_timestamps
+        for slide, timestamp_str in zip(self.slides, timestamp_strs):
+            header = f"## Slide {slide.slide_number}\n\n"
+            if include_timestamps:
+                header += f"**Timestamp:** {timestamp_str}\n\n"
+
+            if slide.has_enhancement:
+                parts.append(_md_slide_enhanced(slide, header))
+            else:
+                parts.append(_md_slide_plain(slide, header))
+
+        Path(output_path).write_text("".join(parts), encoding='utf-8')
+
         print(f"Generated Markdown presentation: {output_path}")
         return output_path
     
     def _generate_pdf_document(self, output_filename: str) -> str:
         """Generate PDF presentation document."""
-        output_path = os.path.join(self.config.output_directory, output_filename)
+        output_path = str(self._out_dir / output_filename)
         
         # Try WeasyPrint first (better HTML to PDF conversion)
         if self._try_weasyprint_pdf(output_path):
@@ -325,15 +542,21 @@ class DocumentGenerator:
         """Generate PDF with ReportLab - completely rewritten."""
         try:
             from reportlab.lib.pagesizes import letter, A4
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak
+            from reportlab.platypus import (BaseDocTemplate, Frame, PageTemplate,
+                                            Paragraph, Spacer, Image, PageBreak,
+                                            KeepTogether)
             from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
             from reportlab.lib.units import inch
             from reportlab.lib import colors
-            
+
             print("Generating PDF with ReportLab...")
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(output_path, pagesize=A4)
+
+            # Create PDF document with a single explicit page template; the
+            # bare BaseDocTemplate skips SimpleDocTemplate's per-build
+            # template bookkeeping
+            doc = BaseDocTemplate(output_path, pagesize=A4)
+            frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+            doc.addPageTemplates([PageTemplate(id='slide', frames=[frame])])
             styles = getSampleStyleSheet()
             story = []
             
@@ -361,72 +584,88 @@ class DocumentGenerator:
             story.append(Paragraph(f"Video Duration: {self._format_duration(self.video_duration)}", cover_meta_style))
             story.append(Paragraph(f"Total Slides: {len(self.slides)}", cover_meta_style))
             story.append(PageBreak())
-            
+
+            # Shared slide styles, built once instead of per slide
+            slide_header_style = ParagraphStyle(
+                'SlideHeader',
+                parent=styles['Heading2'],
+                fontSize=16,
+                spaceAfter=15,
+                textColor=colors.darkblue
+            )
+
+            transcript_style = ParagraphStyle(
+                'Transcript',
+                parent=styles['Normal'],
+                fontSize=11,
+                spaceAfter=20,
+                leading=14,
+                leftIndent=10,
+                rightIndent=10
+            )
+
+            # Serve screenshots from the bytes cached at save_screenshots
+            # time where possible; anything not cached is read from disk
+            # concurrently up front so the build loop works from in-memory
+            # buffers instead of blocking on disk I/O once per slide
+            blobs = {}
+            to_read = []
+            for i, slide in enumerate(self.slides):
+                data = self._screenshot_bytes.get(slide.screenshot_path)
+                if data is not None:
+                    blobs[i] = data
+                    continue
+                path = str(self._out_dir / slide.screenshot_path)
+                if os.path.exists(path):
+                    to_read.append((i, path))
+            if to_read:
+                with ThreadPoolExecutor() as executor:
+                    blobs.update(zip(
+                        (i for i, _ in to_read),
+                        executor.map(lambda p: Path(p).read_bytes(), (p for _, p in to_read))
+                    ))
+
             # SLIDE PAGES
-            for slide in self.slides:
-                # Slide header
-                slide_header_style = ParagraphStyle(
-                    'SlideHeader',
-                    parent=styles['Heading2'],
-                    fontSize=16,
-                    spaceAfter=15,
-                    textColor=colors.darkblue
-                )
-                
+            for i, slide in enumerate(self.slides):
                 slide_header = f"Slide {slide.slide_number}"
                 if self.config.include_timestamps:
                     timestamp_str = self._format_timestamp(slide.timestamp)
                     slide_header += f" ({timestamp_str})"
                 
-                story.append(Paragraph(slide_header, slide_header_style))
-                
+                # Collect the slide's flowables and hand them to the layout
+                # engine as one KeepTogether block so it skips mid-slide
+                # break checks
+                elements = [Paragraph(slide_header, slide_header_style)]
+
                 # Screenshot image
-                screenshot_path = os.path.join(self.config.output_directory, slide.screenshot_path)
-                if os.path.exists(screenshot_path):
+                if i in blobs:
                     try:
-                        img = Image(screenshot_path, width=7*inch, height=4.5*inch)
-                        story.append(img)
-                        story.append(Spacer(1, 20))
+                        img = Image(io.BytesIO(blobs[i]), width=7*inch, height=4.5*inch)
+                        elements.append(img)
+                        elements.append(Spacer(1, 20))
                     except Exception as e:
-                        print(f"ERROR: Could not add image {screenshot_path}: {e}")
-                        story.append(Paragraph("<i>Image could not be loaded</i>", styles['Italic']))
-                        story.append(Spacer(1, 20))
+                        print(f"ERROR: Could not add image {slide.screenshot_path}: {e}")
+                        elements.append(Paragraph("<i>Image could not be loaded</i>", styles['Italic']))
+                        elements.append(Spacer(1, 20))
                 else:
-                    story.append(Paragraph("<i>Screenshot not found</i>", styles['Italic']))
-                    story.append(Spacer(1, 20))
-                
+                    elements.append(Paragraph("<i>Screenshot not found</i>", styles['Italic']))
+                    elements.append(Spacer(1, 20))
+
                 # Enhanced transcript (much shorter)
-                if slide.enhanced_text and slide.enhanced_text != slide.transcript_text:
-                    transcript_style = ParagraphStyle(
-                        'Transcript',
-                        parent=styles['Normal'],
-                        fontSize=11,
-                        spaceAfter=20,
-                        leading=14,
-                        leftIndent=10,
-                        rightIndent=10
-                    )
-                    
+                if slide.has_enhancement:
                     # Truncate to much shorter length
                     short_text = self._truncate_text_for_slide(slide.enhanced_text, max_words=60)
                     formatted_text = self._format_text_for_pdf(short_text)
-                    story.append(Paragraph(formatted_text, transcript_style))
+                    elements.append(Paragraph(formatted_text, transcript_style))
                 elif slide.transcript_text:
                     # Fallback to original transcript
-                    transcript_style = ParagraphStyle(
-                        'Transcript',
-                        parent=styles['Normal'],
-                        fontSize=11,
-                        spaceAfter=20,
-                        leading=14,
-                        leftIndent=10,
-                        rightIndent=10
-                    )
                     short_text = self._truncate_text_for_slide(slide.transcript_text, max_words=60)
-                    story.append(Paragraph(short_text, transcript_style))
+                    elements.append(Paragraph(short_text, transcript_style))
                 else:
-                    story.append(Paragraph("<i>No transcript available for this slide.</i>", styles['Italic']))
-                
+                    elements.append(Paragraph("<i>No transcript available for this slide.</i>", styles['Italic']))
+
+                story.append(KeepTogether(elements))
+
                 # Page break for next slide
                 story.append(PageBreak())
             
@@ -445,9 +684,6 @@ class DocumentGenerator:
     
     def _generate_pdf_html_content(self) -> str:
         """Generate HTML content optimized for PDF conversion."""
-        # Create HTML template if it doesn't exist
-        self._create_html_template()
-        
         # Prepare template data
         template_data = {
             'title': self.video_title,
@@ -459,9 +695,8 @@ class DocumentGenerator:
             'include_navigation': False  # Disable navigation for PDF
         }
         
-        # Render template
-        template = self.jinja_env.get_template('presentation.html')
-        return template.render(**template_data)
+        # Render the cached template
+        return self._presentation_template.render(**template_data)
     
     def _get_pdf_css(self) -> str:
         """Get CSS optimized for PDF generation."""
@@ -546,9 +781,9 @@ class DocumentGenerator:
     
     def _create_html_template(self):
         """Create the default HTML template."""
-        template_path = os.path.join('templates', 'presentation.html')
-        
-        if os.path.exists(template_path):
+        template_path = Path('templates') / 'presentation.html'
+
+        if template_path.exists():
             return
         
         template_content = """<!DOCTYPE html>
@@ -714,21 +949,36 @@ class DocumentGenerator:
 </body>
 </html>"""
         
-        with open(template_path, 'w', encoding='utf-8') as f:
-            f.write(template_content)
+        template_path.write_text(template_content, encoding='utf-8')
     
-    def _format_timestamp(self, seconds: float) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _format_timestamp(seconds: float) -> str:
         """Format timestamp in HH:MM:SS format."""
         hours = int(seconds // 3600)
         minutes = int((seconds % 3600) // 60)
         seconds = int(seconds % 60)
-        
+
         if hours > 0:
             return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
         else:
             return f"{minutes:02d}:{seconds:02d}"
-    
-    def _format_duration(self, seconds: float) -> str:
+
+    @staticmethod
+    def _format_timestamps_batch(seconds_list: List[float]) -> List[str]:
+        """Format many timestamps at once using NumPy integer math."""
+        arr = np.asarray(seconds_list, dtype=np.int64)
+        hours = arr // 3600
+        minutes = (arr % 3600) // 60
+        seconds = arr % 60
+        return [
+            f"{h:02d}:{m:02d}:{s:02d}" if h > 0 else f"{m:02d}:{s:02d}"
+            for h, m, s in zip(hours.tolist(), minutes.tolist(), seconds.tolist())
+        ]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _format_duration(seconds: float) -> str:
         """Format duration in a human-readable format."""
         if seconds < 60:
             return f"{seconds:.1f} seconds"
@@ -744,81 +994,105 @@ class DocumentGenerator:
         Save screenshot images for detected scene changes to a pics folder.
         
         Args:
-            frames: List of (timestamp, frame) tuples
+            frames: Iterable of (timestamp, frame) tuples
             scene_changes: List of detected scene changes
-            
+
         Returns:
             List of screenshot file paths
         """
-        import cv2
-        import os
-        
+        # Accept any iterable; the nearest-frame lookup below needs random
+        # access and a length
+        frames = list(frames)
         screenshot_paths = []
-        
+
         # Create pics directory under output directory
-        pics_dir = os.path.join(self.config.output_directory, 'pics')
+        pics_dir = str(self._out_dir / 'pics')
         os.makedirs(pics_dir, exist_ok=True)
-        
+
         print(f"Saving screenshots to: {pics_dir}")
-        
-        for i, change in enumerate(scene_changes):
-            # Find the closest frame to the scene change timestamp
-            closest_frame = None
-            min_diff = float('inf')
-            
-            for timestamp, frame in frames:
-                diff = abs(timestamp - change.timestamp)
-                if diff < min_diff:
-                    min_diff = diff
-                    closest_frame = frame
-            
-            if closest_frame is not None:
-                # Generate filename and save the image
-                filename = f"screenshot_{i+1:03d}.{self.config.screenshot_format.lower()}"
-                filepath = os.path.join(pics_dir, filename)
-                
-                # Save the image
-                cv2.imwrite(filepath, closest_frame)
-                
-                # Store relative path for HTML/PDF generation
-                relative_path = os.path.join('pics', filename)
-                screenshot_paths.append(relative_path)
+
+        fmt = self.config.screenshot_format.lower()
+        ext = '.' + fmt
+
+        # Frames arrive in timestamp order, so the closest frame for every
+        # scene change comes from one vectorized searchsorted pass instead of
+        # a Python search per change
+        nearest = None
+        if frames:
+            frame_ts = np.fromiter((t for t, _ in frames), dtype=np.float64, count=len(frames))
+            change_ts = np.fromiter((c.timestamp for c in scene_changes),
+                                    dtype=np.float64, count=len(scene_changes))
+            # Frames from extract_frames are time-ordered, but sort
+            # defensively so the searchsorted lookup stays correct if a
+            # caller ever streams frames out of order
+            if len(frames) > 1 and np.any(np.diff(frame_ts) < 0):
+                order = np.argsort(frame_ts, kind='stable')
+                frames = [frames[k] for k in order]
+                frame_ts = frame_ts[order]
+            if len(frames) == 1:
+                nearest = np.zeros(len(scene_changes), dtype=np.int64)
             else:
-                # Fallback if no frame found
-                filename = f"screenshot_{i+1:03d}.{self.config.screenshot_format.lower()}"
-                relative_path = os.path.join('pics', filename)
-                screenshot_paths.append(relative_path)
-        
+                after = np.clip(np.searchsorted(frame_ts, change_ts), 1, len(frames) - 1)
+                before = after - 1
+                take_before = (change_ts - frame_ts[before]) <= (frame_ts[after] - change_ts)
+                nearest = np.where(take_before, before, after)
+
+        write_tasks = []
+
+        for i, change in enumerate(scene_changes):
+            filename = f"screenshot_{i+1:03d}.{fmt}"
+
+            # Forward slashes work everywhere these paths are consumed, and
+            # the f-string beats os.path.join in the loop
+            relpath = f"pics/{filename}"
+
+            if nearest is not None:
+                write_tasks.append((f"{pics_dir}/{filename}", relpath, frames[nearest[i]][1]))
+
+            # Store relative path for HTML/PDF generation
+            screenshot_paths.append(relpath)
+
+        # Displays cap out well below full video resolution, so shrink wide
+        # frames before encoding: fewer pixels to encode, write and embed
+        max_width = self.config.screenshot_max_width
+        encode_params = []
+        if ext in ('.jpg', '.jpeg'):
+            encode_params = [cv2.IMWRITE_JPEG_QUALITY, self.config.screenshot_quality]
+
+        def encode_and_write(task):
+            filepath, relpath, frame = task
+            height, width = frame.shape[:2]
+            if max_width and width > max_width:
+                scale = max_width / width
+                frame = cv2.resize(frame, (max_width, int(height * scale)),
+                                   interpolation=cv2.INTER_AREA)
+            ok, buffer = cv2.imencode(ext, frame, encode_params)
+            if not ok:
+                cv2.imwrite(filepath, frame)
+                return relpath, None
+            data = buffer.tobytes()
+            with open(filepath, 'wb') as fh:
+                fh.write(data)
+            return relpath, data
+
+        # cv2.imencode releases the GIL while encoding, so the writes
+        # parallelize cleanly across cores; the encoded bytes are kept
+        # (up to a size cap) so PDF generation can skip re-reading disk
+        if write_tasks:
+            cached_bytes = sum(len(data) for data in self._screenshot_bytes.values())
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                for relpath, data in executor.map(encode_and_write, write_tasks):
+                    if data is not None and cached_bytes + len(data) <= _SCREENSHOT_CACHE_LIMIT:
+                        self._screenshot_bytes[relpath] = data
+                        cached_bytes += len(data)
+
         print(f"Saved {len(screenshot_paths)} screenshots")
         return screenshot_paths
     
-    def _remove_markdown_formatting(self, text: str) -> str:
+    @staticmethod
+    def _remove_markdown_formatting(text: str) -> str:
         """Remove markdown formatting from text."""
-        # Remove markdown headers
-        text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
-        
-        # Remove markdown bold/italic
-        text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-        text = re.sub(r'\*(.*?)\*', r'\1', text)
-        text = re.sub(r'__(.*?)__', r'\1', text)
-        text = re.sub(r'_(.*?)_', r'\1', text)
-        
-        # Remove markdown lists
-        text = re.sub(r'^\s*[-*+]\s+', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^\s*\d+\.\s+', '', text, flags=re.MULTILINE)
-        
-        # Remove markdown code blocks
-        text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
-        text = re.sub(r'`(.*?)`', r'\1', text)
-        
-        # Remove markdown links
-        text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
-        
-        # Remove extra whitespace and normalize
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        
-        return text.strip()
+        return _strip_markdown(text)
 
     def _format_text_for_pdf(self, text: str) -> str:
         """Format text for PDF generation by removing markdown and adding line breaks."""
@@ -843,103 +1117,179 @@ class DocumentGenerator:
         """
         if not text:
             return text
-        
-        # Split into sentences to avoid cutting mid-sentence
-        sentences = text.split('. ')
-        
-        truncated_text = ""
+
+        # Split into sentences to avoid cutting mid-sentence; terminators
+        # stay attached, so the kept sentences rejoin with a plain space
+        sentences = _SENT_RE.split(text)
+
+        kept = []
         word_count = 0
-        
+        truncated = False
+
         for sentence in sentences:
-            sentence_words = len(sentence.split())
-            
+            # Space counting is a C-level scan; no throwaway word list
+            sentence_words = sentence.count(' ') + 1
+
             # Check if adding this sentence would exceed the limit
             if word_count + sentence_words > max_words:
-                # If we have some content, add ellipsis
-                if truncated_text:
-                    truncated_text += "..."
+                truncated = bool(kept)
                 break
-            
-            # Add the sentence
-            if truncated_text:
-                truncated_text += ". " + sentence
-            else:
-                truncated_text = sentence
-            
+
+            kept.append(sentence)
             word_count += sentence_words
-        
+
+        truncated_text = ' '.join(kept)
+        if truncated:
+            # We cut content, so add ellipsis
+            truncated_text += "..."
+
         return truncated_text.strip()
     
-    def _enhance_slides_with_llm(self, slides: List[PresentationSlide], 
+    def _enhance_slides_with_llm(self, slides: List[PresentationSlide],
                                 transcript_parser: TranscriptParser,
                                 transcript_enhancer: 'TranscriptEnhancer',
-                                enhancement_level: str) -> List[PresentationSlide]:
+                                enhancement_level: str,
+                                cache_path: Optional[str] = None) -> List[PresentationSlide]:
         """
         Enhance transcripts for batches of 2-3 slides at once.
-        
+
         Args:
             slides: List of slides with time ranges
             transcript_parser: Transcript parser with segments
             transcript_enhancer: LLM enhancer
             enhancement_level: Enhancement level
-            
+            cache_path: Optional file to flush the enhancement cache to as
+                batches complete, so interrupted runs keep their results
+
         Returns:
             List of slides with enhanced transcripts
         """
-        enhanced_slides = []
         batch_size = 3  # Process 3 slides at once
-        
-        for i in range(0, len(slides), batch_size):
+
+        # Gather the text for every batch first, then run the API calls
+        # concurrently: each call is a network round-trip, so wall time is
+        # bounded by latency times batches when done serially
+        segments = transcript_parser.segments
+        n_slides = len(slides)
+
+        if n_slides > 50 and segments:
+            # For long videos, compute every batch window in a handful of
+            # vectorized passes: boundary arithmetic on a timestamp array and
+            # two searchsorted calls replace a per-batch Python lookup.
+            # Segments are time-ordered, so each window is the contiguous
+            # slice from the first segment ending at/after the batch start to
+            # the last one starting at/before the batch end
+            timestamps = np.fromiter(
+                (s.timestamp for s in slides), dtype=np.float64, count=n_slides
+            )
+            first_idx = np.arange(0, n_slides, batch_size)
+            last_idx = np.minimum(first_idx + batch_size - 1, n_slides - 1)
+            batch_starts = timestamps[first_idx]
+            batch_ends = timestamps[last_idx] + 120.0  # Add 2 minutes for last slide
+
+            seg_starts = np.fromiter(
+                (s.start_time for s in segments), dtype=np.float64, count=len(segments)
+            )
+            # Raw end times are unsorted when cues overlap; their running
+            # maximum is sorted, and everything before its crossing index
+            # has already ended (mirrors transcript_parser._time_index)
+            seg_end_maxes = np.maximum.accumulate(np.fromiter(
+                (s.end_time for s in segments), dtype=np.float64, count=len(segments)
+            ))
+            los = np.searchsorted(seg_end_maxes, batch_starts, side='left')
+            his = np.searchsorted(seg_starts, batch_ends, side='right')
+            batch_windows = [
+                [s for s in segments[lo:hi]
+                 if s.start_time <= end and s.end_time >= start]
+                for lo, hi, start, end in zip(
+                    los.tolist(), his.tolist(),
+                    batch_starts.tolist(), batch_ends.tolist())
+            ]
+        else:
+            get_segments_in_range = _segment_range_lookup(segments)
+            batch_windows = []
+            for i in range(0, n_slides, batch_size):
+                batch_slides = slides[i:i + batch_size]
+
+                # Get time range for this batch
+                batch_start = batch_slides[0].timestamp
+                batch_end = batch_slides[-1].timestamp + 120.0  # Add 2 minutes for last slide
+
+                batch_windows.append(get_segments_in_range(batch_start, batch_end))
+
+        batch_inputs = []  # (batch_index, batch_slides, combined_text or None)
+        for index, i in enumerate(range(0, n_slides, batch_size)):
             batch_slides = slides[i:i + batch_size]
-            print(f"Processing batch of {len(batch_slides)} slides (slides {i+1}-{i+len(batch_slides)})")
-            
-            # Get time range for this batch
-            batch_start = batch_slides[0].timestamp
-            batch_end = batch_slides[-1].timestamp + 120.0  # Add 2 minutes for last slide
-            
-            # Get all segments within this batch's time range
-            segments_in_range = transcript_parser.get_segments_in_range(batch_start, batch_end)
-            
-            if segments_in_range:
-                # Combine original text for enhancement
-                original_texts = []
-                for segment in segments_in_range:
-                    if segment.text:
-                        original_texts.append(segment.text)
-                
-                combined_original_text = " ".join(original_texts)
+            segments_in_range = batch_windows[index]
+
+            # str.join drives the generator in C; only clean when there is
+            # actually text to clean
+            combined_original_text = " ".join(s.text for s in segments_in_range if s.text)
+            if combined_original_text:
                 combined_original_text = transcript_parser.clean_text(combined_original_text)
-                
-                # Enhance the combined text for multiple slides
-                try:
-                    enhanced_result = transcript_enhancer.enhance_transcript_segment(
-                        type('Segment', (), {'text': combined_original_text})(),
-                        enhancement_level
-                    )
-                    
-                    # Split enhanced text across the slides in this batch
-                    enhanced_text = self._remove_markdown_formatting(enhanced_result.enhanced_text)
-                    split_texts = self._split_text_for_slides(enhanced_text, len(batch_slides))
-                    
-                    # Create enhanced slides
-                    for j, slide in enumerate(batch_slides):
-                        enhanced_slide = PresentationSlide(
-                            timestamp=slide.timestamp,
-                            screenshot_path=slide.screenshot_path,
-                            transcript_text=slide.transcript_text,  # Keep original
-                            slide_number=slide.slide_number,
-                            enhanced_text=split_texts[j] if j < len(split_texts) else "",
-                            key_points=enhanced_result.key_points if j == 0 else []  # Key points only on first slide
-                        )
-                        
-                        enhanced_slides.append(enhanced_slide)
-                    
-                except Exception as e:
-                    print(f"Warning: Failed to enhance batch {i//batch_size + 1}: {e}")
-                    enhanced_slides.extend(batch_slides)
-            else:
+
+            batch_inputs.append((index, batch_slides, combined_original_text))
+
+        def enhance_batch(combined_text: str):
+            result = transcript_enhancer.enhance_transcript_segment(
+                _Segment(combined_text), enhancement_level
+            )
+            # Strip markdown here at the enhancement boundary so the cleaned
+            # text rides along with the result and the assembly loop never
+            # re-scans it
+            return result, _strip_markdown(result.enhanced_text)
+
+        results = {}
+        to_enhance = [(index, text) for index, _, text in batch_inputs if text]
+        if to_enhance:
+            print(f"Enhancing {len(to_enhance)} slide batches concurrently...")
+            completed = 0
+            # Match the enhancer's concurrency ceiling: its semaphore and
+            # httpx pool are sized for max_concurrent_requests, so more
+            # workers here would just queue on cold connections
+            with ThreadPoolExecutor(
+                    max_workers=self.config.max_concurrent_requests) as executor:
+                futures = {executor.submit(enhance_batch, text): index
+                           for index, text in to_enhance}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        print(f"Warning: Failed to enhance batch {index + 1}: {e}")
+                        continue
+                    # Persist incrementally so a crash or Ctrl-C does not
+                    # throw away API calls already paid for; save_cache
+                    # swallows I/O errors itself
+                    completed += 1
+                    if cache_path and completed % _CACHE_FLUSH_INTERVAL == 0:
+                        transcript_enhancer.save_cache(cache_path)
+            if cache_path and completed % _CACHE_FLUSH_INTERVAL != 0:
+                transcript_enhancer.save_cache(cache_path)
+
+        # Assemble in original order; batches without a result keep their
+        # original slides
+        enhanced_slides = []
+        for index, batch_slides, _ in batch_inputs:
+            enhanced = results.get(index)
+            if enhanced is None:
                 enhanced_slides.extend(batch_slides)
-        
+                continue
+            enhanced_result, enhanced_text = enhanced
+
+            # Split the already-clean enhanced text across this batch's slides
+            split_texts = self._split_text_for_slides(enhanced_text, len(batch_slides))
+
+            for j, slide in enumerate(batch_slides):
+                enhanced_slides.append(PresentationSlide(
+                    timestamp=slide.timestamp,
+                    screenshot_path=slide.screenshot_path,
+                    transcript_text=slide.transcript_text,  # Keep original
+                    slide_number=slide.slide_number,
+                    enhanced_text=split_texts[j] if j < len(split_texts) else "",
+                    key_points=enhanced_result.key_points if j == 0 else []  # Key points only on first slide
+                ))
+
         return enhanced_slides
     
     def _split_text_for_slides(self, text: str, num_slides: int) -> List[str]:
@@ -955,27 +1305,30 @@ class DocumentGenerator:
         """
         if num_slides <= 1:
             return [text]
-        
-        # Split into sentences
-        sentences = text.split('. ')
-        
+
+        # Split into sentences; each keeps its own terminator
+        sentences = _SENT_RE.split(text)
+
+        # Trivial case: one sentence (or fewer) per slide — pad with empty
+        # slides
+        if len(sentences) <= num_slides:
+            slide_texts = list(sentences)
+            slide_texts.extend([''] * (num_slides - len(sentences)))
+            return slide_texts
+
         # Calculate sentences per slide
         sentences_per_slide = max(1, len(sentences) // num_slides)
-        
+
         slide_texts = []
+        remaining = iter(sentences)
         for i in range(num_slides):
-            start_idx = i * sentences_per_slide
-            end_idx = start_idx + sentences_per_slide if i < num_slides - 1 else len(sentences)
-            
-            slide_sentences = sentences[start_idx:end_idx]
-            slide_text = '. '.join(slide_sentences)
-            
-            # Ensure it ends with a period
-            if slide_text and not slide_text.endswith('.'):
-                slide_text += '.'
-            
-            slide_texts.append(slide_text)
-        
+            if i < num_slides - 1:
+                slide_sentences = list(islice(remaining, sentences_per_slide))
+            else:
+                # Last slide takes whatever is left
+                slide_sentences = list(remaining)
+            slide_texts.append(' '.join(slide_sentences))
+
         return slide_texts
     
     def create_presentation_with_slides(self, slides: List[PresentationSlide],
@@ -999,7 +1352,7 @@ class DocumentGenerator:
         self.slides = slides
         
         # Store output path for screenshot directory creation
-        self.output_path = os.path.join(self.config.output_directory, output_filename)
+        self.output_path = str(self._out_dir / output_filename)
         
         print("Generating presentation document...")
         
@@ -1026,31 +1379,33 @@ class DocumentGenerator:
             True if saved successfully
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write("Enhanced Transcript by Slides\n")
-                f.write("=" * 50 + "\n\n")
-                
-                for slide in slides:
-                    f.write(f"Slide {slide.slide_number} (Timestamp: {self._format_timestamp(slide.timestamp)})\n")
-                    f.write("-" * 40 + "\n")
-                    
-                    if slide.enhanced_text and slide.enhanced_text != slide.transcript_text:
-                        f.write("Enhanced Transcript:\n")
-                        f.write(f"{slide.enhanced_text}\n\n")
-                        
-                        if slide.key_points:
-                            f.write("Key Points:\n")
-                            for point in slide.key_points:
-                                f.write(f"  - {point}\n")
-                            f.write("\n")
-                        
-                        f.write("Original Transcript:\n")
-                        f.write(f"{slide.transcript_text}\n")
-                    else:
-                        f.write(f"{slide.transcript_text}\n")
-                    
-                    f.write("\n" + "=" * 50 + "\n\n")
-            
+            # Collect everything and write once; per-fragment f.write calls
+            # add up over many slides
+            chunks = ["Enhanced Transcript by Slides\n", "=" * 50 + "\n\n"]
+
+            # One vectorized pass for every slide timestamp
+            timestamp_strs = self._format_timestamps_batch([s.timestamp for s in slides])
+
+            for slide, timestamp_str in zip(slides, timestamp_strs):
+                chunks.append(f"Slide {slide.slide_number} (Timestamp: {timestamp_str})\n")
+                chunks.append("-" * 40 + "\n")
+
+                if slide.has_enhancement:
+                    chunks.append(f"Enhanced Transcript:\n{slide.enhanced_text}\n\n")
+
+                    if slide.key_points:
+                        points = "\n".join(f"  - {point}" for point in slide.key_points)
+                        chunks.append(f"Key Points:\n{points}\n\n")
+
+                    chunks.append(f"Original Transcript:\n{slide.transcript_text}\n")
+                else:
+                    chunks.append(f"{slide.transcript_text}\n")
+
+                chunks.append("\n" + "=" * 50 + "\n\n")
+
+            with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write(''.join(chunks))
+
             print(f"Enhanced transcript saved to: {output_path}")
             return True
             
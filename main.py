@@ -5,8 +5,12 @@ Main entry point for extracting presentations from YouTube videos
 """
 
 import argparse
+import concurrent.futures
+import logging
+import re
 import sys
 import os
+from dataclasses import replace
 from pathlib import Path
 from typing import Optional
 
@@ -19,11 +23,6 @@ except ImportError:
     pass
 
 from config import Config, load_config_from_file, save_config_to_file, get_resolution_presets
-from video_processor import VideoProcessor
-from scene_detector import SceneDetector
-from transcript_parser import TranscriptParser
-from document_generator import DocumentGenerator
-from transcript_enhancer import TranscriptEnhancer
 
 
 def parse_arguments():
@@ -174,26 +173,246 @@ Examples:
     return parser.parse_args()
 
 
+# Accepted YouTube URL formats, combined into one pattern compiled at import
+_YOUTUBE_URL_RE = re.compile(
+    r"https?://(?:(?:www\.)?youtube\.com/(?:watch\?v=|embed/)|youtu\.be/)[\w-]+"
+)
+
+
 def validate_url(url: str) -> bool:
     """Validate YouTube URL format."""
-    youtube_patterns = [
-        r"https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+",
-        r"https?://youtu\.be/[\w-]+",
-        r"https?://(?:www\.)?youtube\.com/embed/[\w-]+"
-    ]
-    
-    import re
-    for pattern in youtube_patterns:
-        if re.match(pattern, url):
-            return True
-    
-    return False
+    return _YOUTUBE_URL_RE.match(url) is not None
+
+
+def _subtitle_snapshot(subtitle_files) -> frozenset:
+    """Fingerprint a subtitle file set by (path, size).
+
+    Used to tell whether files parsed while the download was still running
+    are identical to the final set, or whether yt-dlp added/extended any
+    afterwards and a re-parse is needed.
+    """
+    return frozenset(
+        (f, os.path.getsize(f)) for f in subtitle_files if os.path.exists(f)
+    )
+
+
+def run(youtube_url: str, config: Config, output_filename: str = "presentation.html") -> str:
+    """
+    Run the extraction pipeline for a single video.
+
+    Args:
+        youtube_url: YouTube video URL to process
+        config: Fully configured Config instance
+        output_filename: Name of the output file
+
+    Returns:
+        Path to the generated document
+
+    Raises:
+        Exception: If any pipeline stage fails
+    """
+    config.ensure_dirs()
+
+    # Import the pipeline components here so that --help, argument errors and
+    # URL validation don't pay for loading cv2, numpy and jinja2
+    from video_processor import VideoProcessor
+    from scene_detector import SceneDetector
+    from transcript_parser import TranscriptParser
+    from document_generator import DocumentGenerator
+
+    # Initialize components
+    video_processor = VideoProcessor(config)
+    scene_detector = SceneDetector(config)
+    transcript_parser = TranscriptParser()
+    document_generator = DocumentGenerator(config)
+
+    # Initialize transcript enhancer if enabled
+    transcript_enhancer = None
+    if config.enable_llm_enhancement:
+        try:
+            from transcript_enhancer import get_enhancer
+            transcript_enhancer = get_enhancer(config)
+            print("LLM enhancement initialized successfully")
+        except Exception as e:
+            print(f"Warning: Failed to initialize LLM enhancement: {e}")
+            print("Continuing without transcript enhancement...")
+            config = replace(config, enable_llm_enhancement=False)
+
+    # Download video; yt-dlp writes subtitle files early in the download,
+    # so parse them while the media transfer is still on the wire
+    print("\n1. Downloading video...")
+    early_state = None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        download = executor.submit(video_processor.download_video, youtube_url)
+
+        # Pay OpenCV's one-time backend/plugin initialization while the
+        # transfer is on the wire instead of in front of frame extraction
+        try:
+            import cv2
+            cv2.VideoCapture().release()
+        except Exception:
+            pass
+
+        while True:
+            try:
+                metadata = download.result(timeout=0.25)
+                break
+            except concurrent.futures.TimeoutError:
+                pass
+
+            if early_state is None:
+                try:
+                    early_files = video_processor.get_subtitle_files()
+                    if early_files:
+                        # Fingerprint before parsing: a write landing after
+                        # the snapshot then shows up as a size mismatch and
+                        # forces the re-parse, instead of the final size
+                        # vouching for content parsed mid-write
+                        snapshot = _subtitle_snapshot(early_files)
+                        if transcript_parser.load_subtitles(early_files):
+                            early_state = snapshot
+                except Exception:
+                    # The download thread owns the temp dir; files can
+                    # appear or be converted mid-poll
+                    pass
+
+    # Load subtitles (already done if the early parse covered the final set)
+    print("\n2. Loading subtitles...")
+    subtitle_files = video_processor.get_subtitle_files()
+    if subtitle_files:
+        print(f"   Found {len(subtitle_files)} subtitle files:")
+        for file in subtitle_files:
+            print(f"     - {Path(file).name}")
+
+        if (early_state == _subtitle_snapshot(subtitle_files)
+                or transcript_parser.load_subtitles(subtitle_files)):
+            stats = transcript_parser.get_statistics()
+            print(f"   Loaded {stats.get('total_segments', 0)} transcript segments")
+            print(f"   Total words: {stats.get('total_words', 0)}")
+
+            # Save original transcript
+            original_transcript_path = os.path.join(config.output_directory, "original_transcript.txt")
+            transcript_parser.save_original_transcript(original_transcript_path)
+        else:
+            print("   Warning: Could not parse subtitle files")
+    else:
+        print("   Warning: No subtitle files found")
+        print("   This might be because:")
+        print("     - The video doesn't have subtitles/captions")
+        print("     - Subtitles are not available in the requested language")
+        print("     - yt-dlp failed to download subtitles")
+
+    # Extract frames
+    print("\n3. Extracting video frames...")
+    start_time = config.intro_outro_duration if config.skip_intro_outro else 0
+    end_time = metadata.duration - config.intro_outro_duration if config.skip_intro_outro else None
+
+    # Stream frames straight into scene detection: holding the whole
+    # video's frames in a list costs gigabytes for nothing
+    frames = video_processor.iter_frames(start_time, end_time)
+
+    # Detect scene changes
+    print("\n4. Detecting scene changes...")
+    scene_changes = scene_detector.detect_scenes(frames)
+
+    if not scene_changes:
+        print("Warning: No scene changes detected. Trying advanced detection...")
+        scene_changes = scene_detector.detect_scenes_advanced(video_processor.video_path)
+
+    if not scene_changes:
+        raise Exception("No scene changes detected. The video might not contain presentation slides.")
+
+    # Filter and merge scene changes
+    scene_changes = scene_detector.filter_changes_by_confidence(scene_changes, min_confidence=0.5)
+    scene_changes = scene_detector.merge_nearby_changes(scene_changes, time_threshold=3.0)
+    scene_changes = scene_detector.skip_intro_outro(scene_changes, metadata.duration)
+
+    print(f"   Detected {len(scene_changes)} significant scene changes")
+
+    # Generate slide references
+    print("\n5. Generating slide references...")
+    # Scene detection consumed the frame stream, so decode just the frames
+    # at the detected changes for the screenshots
+    scene_frames = video_processor.frames_at([c.timestamp for c in scene_changes])
+    screenshot_paths = document_generator.save_screenshots(scene_frames, scene_changes)
+
+    # Create initial slides to determine time ranges
+    print("\n6. Creating slide structure...")
+    initial_slides = document_generator._create_slides(scene_changes, transcript_parser)
+    print(f"   Created {len(initial_slides)} slides with time ranges")
+
+    # Enhance transcripts based on slide time ranges if enabled
+    if config.enable_llm_enhancement and transcript_enhancer:
+        print("\n7. Enhancing transcripts based on slide time ranges...")
+        try:
+            # Reuse cached results from earlier runs of the same video and
+            # flush new ones as batches complete, so an interrupted run
+            # keeps the LLM work already paid for
+            cache_path = None
+            if config.cache_enhanced_results:
+                cache_path = os.path.join(config.output_directory, config.cache_file)
+                transcript_enhancer.load_cache(cache_path)
+
+            # Enhance transcripts for each slide's time range
+            enhanced_slides = document_generator._enhance_slides_with_llm(
+                initial_slides, transcript_parser, transcript_enhancer, config.enhancement_level,
+                cache_path=cache_path
+            )
+
+            # Update the slides with enhanced content
+            initial_slides = enhanced_slides
+
+            # Save enhanced transcript
+            enhanced_transcript_path = os.path.join(config.output_directory, "enhanced_transcript.txt")
+            document_generator._save_enhanced_transcript_by_slides(enhanced_slides, enhanced_transcript_path)
+
+            print(f"   Enhanced transcripts for {len(enhanced_slides)} slides")
+
+        except Exception as e:
+            print(f"   Warning: Transcript enhancement failed: {e}")
+            print("   Continuing with original transcripts...")
+
+    # Generate presentation document
+    print("\n8. Generating presentation document...")
+    output_path = document_generator.create_presentation_with_slides(
+        slides=initial_slides,
+        video_title=metadata.title,
+        video_duration=metadata.duration,
+        output_filename=output_filename
+    )
+
+    # Cleanup
+    video_processor.cleanup()
+
+    # Save enhancement cache if available
+    if transcript_enhancer and config.cache_enhanced_results:
+        cache_path = os.path.join(config.output_directory, config.cache_file)
+        transcript_enhancer.save_cache(cache_path)
+
+    print("\n" + "=" * 60)
+    print("Extraction completed successfully!")
+    print(f"Output file: {output_path}")
+    print(f"Total slides: {len(scene_changes)}")
+    print(f"Video duration: {metadata.duration:.2f} seconds")
+
+    if config.enable_llm_enhancement and transcript_enhancer:
+        enh_stats = transcript_enhancer.get_stats()
+        print(f"Enhanced segments: {enh_stats.enhanced_segments}")
+        print(f"Total enhancement cost: ${enh_stats.total_cost:.2f}")
+
+    print("=" * 60)
+
+    return output_path
 
 
 def main():
     """Main function."""
+    # Configure logging once at the entry point; library modules only
+    # create loggers
+    logging.basicConfig(level=logging.INFO)
+
     args = parse_arguments()
-    
+
     # Validate YouTube URL
     if not validate_url(args.youtube_url):
         print("Error: Invalid YouTube URL format")
@@ -207,44 +426,47 @@ def main():
     config = Config()
     if args.config:
         config = load_config_from_file(args.config)
-    
+
     # Override config with command line arguments
-    config.output_directory = args.output_dir
-    config.output_format = args.format.upper()
-    config.scene_change_threshold = args.sensitivity
-    config.min_time_between_captures = args.min_time
-    config.skip_intro_outro = not args.no_intro_outro
-    config.include_timestamps = not args.no_timestamps
-    config.include_navigation = not args.no_navigation
-    config.video_quality = args.video_quality
-    
-    # LLM Enhancement settings
-    config.enable_llm_enhancement = args.enhance_transcript
-    config.enhancement_level = args.enhancement_level
-    config.max_cost_per_video = args.max_cost
-    config.cache_enhanced_results = not args.no_cache
-    
+    overrides = {
+        'output_directory': args.output_dir,
+        'output_format': args.format.upper(),
+        'scene_change_threshold': args.sensitivity,
+        'min_time_between_captures': args.min_time,
+        'skip_intro_outro': not args.no_intro_outro,
+        'include_timestamps': not args.no_timestamps,
+        'include_navigation': not args.no_navigation,
+        'video_quality': args.video_quality,
+        # LLM Enhancement settings
+        'enable_llm_enhancement': args.enhance_transcript,
+        'enhancement_level': args.enhancement_level,
+        'max_cost_per_video': args.max_cost,
+        'cache_enhanced_results': not args.no_cache,
+    }
+
     # Handle resolution settings
     if args.resolution_preset:
         presets = get_resolution_presets()
-        config.target_resolution = presets[args.resolution_preset]
-        print(f"Using preset resolution: {args.resolution_preset} ({config.target_resolution[0]}x{config.target_resolution[1]})")
+        target = overrides['target_resolution'] = presets[args.resolution_preset]
+        print(f"Using preset resolution: {args.resolution_preset} ({target[0]}x{target[1]})")
     elif args.resolution:
-        config.target_resolution = tuple(args.resolution)
-        print(f"Using custom resolution: {config.target_resolution[0]}x{config.target_resolution[1]}")
-    
+        target = overrides['target_resolution'] = tuple(args.resolution)
+        print(f"Using custom resolution: {target[0]}x{target[1]}")
+
     # Handle screenshot resolution
     if args.screenshot_resolution:
-        config.screenshot_resolution = tuple(args.screenshot_resolution)
-        print(f"Using screenshot resolution: {config.screenshot_resolution[0]}x{config.screenshot_resolution[1]}")
-    
+        sres = overrides['screenshot_resolution'] = tuple(args.screenshot_resolution)
+        print(f"Using screenshot resolution: {sres[0]}x{sres[1]}")
+
+    config = replace(config, **overrides)
+
     # Save configuration if requested
     if args.save_config:
         save_config_to_file(config, args.save_config)
         print(f"Configuration saved to: {args.save_config}")
-    
+
     # Ensure output directory exists
-    os.makedirs(config.output_directory, exist_ok=True)
+    config.ensure_dirs()
     
     print("=" * 60)
     print("YouTube Presentation Extractor")
@@ -265,143 +487,8 @@ def main():
     print("-" * 60)
     
     try:
-        # Initialize components
-        video_processor = VideoProcessor(config)
-        scene_detector = SceneDetector(config)
-        transcript_parser = TranscriptParser()
-        document_generator = DocumentGenerator(config)
-        
-        # Initialize transcript enhancer if enabled
-        transcript_enhancer = None
-        if config.enable_llm_enhancement:
-            try:
-                transcript_enhancer = TranscriptEnhancer(config)
-                print("LLM enhancement initialized successfully")
-            except Exception as e:
-                print(f"Warning: Failed to initialize LLM enhancement: {e}")
-                print("Continuing without transcript enhancement...")
-                config.enable_llm_enhancement = False
-        
-        # Download video
-        print("\n1. Downloading video...")
-        metadata = video_processor.download_video(args.youtube_url)
-        
-        # Load subtitles
-        print("\n2. Loading subtitles...")
-        subtitle_files = video_processor.get_subtitle_files()
-        if subtitle_files:
-            print(f"   Found {len(subtitle_files)} subtitle files:")
-            for file in subtitle_files:
-                print(f"     - {Path(file).name}")
-            
-            if transcript_parser.load_subtitles(subtitle_files):
-                stats = transcript_parser.get_statistics()
-                print(f"   Loaded {stats.get('total_segments', 0)} transcript segments")
-                print(f"   Total words: {stats.get('total_words', 0)}")
-                
-                # Save original transcript
-                original_transcript_path = os.path.join(config.output_directory, "original_transcript.txt")
-                transcript_parser.save_original_transcript(original_transcript_path)
-            else:
-                print("   Warning: Could not parse subtitle files")
-        else:
-            print("   Warning: No subtitle files found")
-            print("   This might be because:")
-            print("     - The video doesn't have subtitles/captions")
-            print("     - Subtitles are not available in the requested language")
-            print("     - yt-dlp failed to download subtitles")
-        
-        # Extract frames
-        print("\n3. Extracting video frames...")
-        start_time = config.intro_outro_duration if config.skip_intro_outro else 0
-        end_time = metadata.duration - config.intro_outro_duration if config.skip_intro_outro else None
-        
-        frames = video_processor.extract_frames(start_time, end_time)
-        
-        if not frames:
-            print("Error: No frames extracted from video")
-            sys.exit(1)
-        
-        # Detect scene changes
-        print("\n4. Detecting scene changes...")
-        scene_changes = scene_detector.detect_scenes(frames)
-        
-        if not scene_changes:
-            print("Warning: No scene changes detected. Trying advanced detection...")
-            scene_changes = scene_detector.detect_scenes_advanced(video_processor.video_path)
-        
-        if not scene_changes:
-            print("Error: No scene changes detected. The video might not contain presentation slides.")
-            sys.exit(1)
-        
-        # Filter and merge scene changes
-        scene_changes = scene_detector.filter_changes_by_confidence(scene_changes, min_confidence=0.5)
-        scene_changes = scene_detector.merge_nearby_changes(scene_changes, time_threshold=3.0)
-        scene_changes = scene_detector.skip_intro_outro(scene_changes, metadata.duration)
-        
-        print(f"   Detected {len(scene_changes)} significant scene changes")
-        
-        # Generate slide references
-        print("\n5. Generating slide references...")
-        screenshot_paths = document_generator.save_screenshots(frames, scene_changes)
-        
-        # Create initial slides to determine time ranges
-        print("\n6. Creating slide structure...")
-        initial_slides = document_generator._create_slides(scene_changes, transcript_parser)
-        print(f"   Created {len(initial_slides)} slides with time ranges")
-        
-        # Enhance transcripts based on slide time ranges if enabled
-        if config.enable_llm_enhancement and transcript_enhancer:
-            print("\n7. Enhancing transcripts based on slide time ranges...")
-            try:
-                # Enhance transcripts for each slide's time range
-                enhanced_slides = document_generator._enhance_slides_with_llm(
-                    initial_slides, transcript_parser, transcript_enhancer, config.enhancement_level
-                )
-                
-                # Update the slides with enhanced content
-                initial_slides = enhanced_slides
-                
-                # Save enhanced transcript
-                enhanced_transcript_path = os.path.join(config.output_directory, "enhanced_transcript.txt")
-                document_generator._save_enhanced_transcript_by_slides(enhanced_slides, enhanced_transcript_path)
-                
-                print(f"   Enhanced transcripts for {len(enhanced_slides)} slides")
-                
-            except Exception as e:
-                print(f"   Warning: Transcript enhancement failed: {e}")
-                print("   Continuing with original transcripts...")
-        
-        # Generate presentation document
-        print("\n8. Generating presentation document...")
-        output_path = document_generator.create_presentation_with_slides(
-            slides=initial_slides,
-            video_title=metadata.title,
-            video_duration=metadata.duration,
-            output_filename=args.output
-        )
-        
-        # Cleanup
-        video_processor.cleanup()
-        
-        # Save enhancement cache if available
-        if transcript_enhancer and config.cache_enhanced_results:
-            cache_path = os.path.join(config.output_directory, config.cache_file)
-            transcript_enhancer.save_cache(cache_path)
-        
-        print("\n" + "=" * 60)
-        print("Extraction completed successfully!")
-        print(f"Output file: {output_path}")
-        print(f"Total slides: {len(scene_changes)}")
-        print(f"Video duration: {metadata.duration:.2f} seconds")
-        
-        if config.enable_llm_enhancement and transcript_enhancer:
-            enh_stats = transcript_enhancer.get_stats()
-            print(f"Enhanced segments: {enh_stats.enhanced_segments}")
-            print(f"Total enhancement cost: ${enh_stats.total_cost:.2f}")
-        
-        print("=" * 60)
-        
+        run(args.youtube_url, config, args.output)
+
     except KeyboardInterrupt:
         print("\n\nExtraction interrupted by user")
         sys.exit(1)
@@ -115,8 +115,8 @@ def main():
     print("=" * 50)
     
     # Check Python version
-    if sys.version_info < (3, 8):
-        print("✗ Python 3.8 or higher is required.")
+    if sys.version_info < (3, 10):
+        print("✗ Python 3.10 or higher is required.")
         print(f"Current version: {sys.version}")
         sys.exit(1)
     
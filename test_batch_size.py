@@ -3,7 +3,7 @@
 Test script to verify batch sizes are now larger.
 """
 
-from transcript_enhancer import TranscriptEnhancer
+from transcript_enhancer import get_enhancer
 from transcript_parser import TranscriptSegment
 from config import Config
 
@@ -14,12 +14,13 @@ def test_batch_sizes():
     print("=" * 50)
     
     # Create test configuration
-    config = Config()
-    config.enable_llm_enhancement = True
-    config.batch_target_tokens = 1500
-    config.enable_batching = True
+    config = Config(
+        enable_llm_enhancement=True,
+        batch_target_tokens=1500,
+        enable_batching=True
+    )
     
-    enhancer = TranscriptEnhancer(config)
+    enhancer = get_enhancer(config)
     
     # Create many small segments (like real transcript segments)
     test_segments = []
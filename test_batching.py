@@ -5,6 +5,7 @@ Test script for the new batching functionality and prompt improvements.
 
 import os
 import sys
+from dataclasses import replace
 from pathlib import Path
 
 # Load environment variables from .env file
@@ -15,7 +16,7 @@ except ImportError:
     # dotenv not available, continue without it
     pass
 
-from transcript_enhancer import TranscriptEnhancer
+from transcript_enhancer import get_enhancer
 from transcript_parser import TranscriptSegment
 from config import Config
 
@@ -35,18 +36,19 @@ def test_batching_functionality():
     print("✅ API key found")
     
     # Create test configuration with batching enabled
-    config = Config()
-    config.enable_llm_enhancement = True
-    config.enhancement_level = "detailed"
-    config.enable_batching = True
-    config.batch_target_tokens = 200
-    config.max_cost_per_video = 1.0  # Low cost limit for testing
-    config.cache_enhanced_results = False
+    config = Config(
+        enable_llm_enhancement=True,
+        enhancement_level="detailed",
+        enable_batching=True,
+        batch_target_tokens=200,
+        max_cost_per_video=1.0,  # Low cost limit for testing
+        cache_enhanced_results=False
+    )
     
     try:
         # Initialize transcript enhancer
         print("Initializing transcript enhancer with batching...")
-        enhancer = TranscriptEnhancer(config)
+        enhancer = get_enhancer(config)
         print("✅ Transcript enhancer initialized successfully")
         
         # Create test transcript segments with varying lengths
@@ -150,22 +152,23 @@ def test_prompt_styles():
     print("\nTesting Prompt Styles")
     print("=" * 50)
     
-    config = Config()
-    config.enable_llm_enhancement = True
-    config.enhancement_level = "detailed"
-    config.enable_batching = False  # Disable batching for this test
-    
+    config = Config(
+        enable_llm_enhancement=True,
+        enhancement_level="detailed",
+        enable_batching=False  # Disable batching for this test
+    )
+
     try:
-        enhancer = TranscriptEnhancer(config)
-        
+        enhancer = get_enhancer(config)
+
         test_text = "Machine learning is a subset of AI that uses algorithms to learn from data."
-        
+
         # Test different prompt styles
         styles = ["clear", "academic", "conversational", "technical"]
-        
+
         for style in styles:
             print(f"\nTesting {style} style:")
-            config.prompt_style = style
+            enhancer.config = replace(config, prompt_style=style)
             prompt = enhancer._get_enhancement_prompt(test_text, "detailed")
             print(f"  Prompt preview: {prompt[:200]}...")
         
@@ -182,13 +185,12 @@ def test_custom_prompt():
     print("\nTesting Custom Prompt Template")
     print("=" * 50)
     
-    config = Config()
-    config.enable_llm_enhancement = True
-    config.enhancement_level = "detailed"
-    config.enable_batching = False
-    
-    # Set custom prompt template
-    config.custom_prompt_template = """
+    config = Config(
+        enable_llm_enhancement=True,
+        enhancement_level="detailed",
+        enable_batching=False,
+        # Set custom prompt template
+        custom_prompt_template="""
 You are an expert at improving presentation transcripts. Please enhance the following text:
 
 {text}
@@ -201,9 +203,10 @@ Focus on:
 
 Provide the enhanced text in a clear, structured format.
 """
+    )
     
     try:
-        enhancer = TranscriptEnhancer(config)
+        enhancer = get_enhancer(config)
         
         test_text = "Machine learning is a subset of AI that uses algorithms to learn from data."
         prompt = enhancer._get_enhancement_prompt(test_text, "detailed")
@@ -4,10 +4,22 @@ Test script to verify YouTube Presentation Extractor installation
 """
 
 import sys
-import importlib
+import importlib.util
+
+def module_available(name: str) -> bool:
+    """Check whether a module can be found without actually loading it.
+
+    find_spec only consults the import machinery, so multi-megabyte
+    libraries like cv2 and numpy are never executed for a mere
+    availability check.
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
 
 def test_imports():
-    """Test if all required modules can be imported."""
+    """Test if all required modules are available."""
     required_modules = [
         'cv2',
         'numpy',
@@ -17,22 +29,21 @@ def test_imports():
         'jinja2',
         'srt'
     ]
-    
-    print("Testing module imports...")
+
+    print("Testing module availability...")
     failed_imports = []
-    
+
     for module in required_modules:
-        try:
-            importlib.import_module(module)
+        if module_available(module):
             print(f"✓ {module}")
-        except ImportError as e:
-            print(f"✗ {module}: {e}")
+        else:
+            print(f"✗ {module}: not found")
             failed_imports.append(module)
-    
+
     return failed_imports
 
 def test_local_modules():
-    """Test if local modules can be imported."""
+    """Test if local modules are available."""
     local_modules = [
         'config',
         'video_processor',
@@ -40,18 +51,17 @@ def test_local_modules():
         'transcript_parser',
         'document_generator'
     ]
-    
-    print("\nTesting local module imports...")
+
+    print("\nTesting local module availability...")
     failed_imports = []
-    
+
     for module in local_modules:
-        try:
-            importlib.import_module(module)
+        if module_available(module):
             print(f"✓ {module}")
-        except ImportError as e:
-            print(f"✗ {module}: {e}")
+        else:
+            print(f"✗ {module}: not found")
             failed_imports.append(module)
-    
+
     return failed_imports
 
 def test_ytdlp():
@@ -78,8 +88,8 @@ def main():
     
     # Test Python version
     print(f"Python version: {sys.version}")
-    if sys.version_info < (3, 8):
-        print("⚠ Warning: Python 3.8 or higher is recommended")
+    if sys.version_info < (3, 10):
+        print("⚠ Warning: Python 3.10 or higher is recommended")
     
     # Test imports
     failed_required = test_imports()
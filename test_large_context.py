@@ -15,7 +15,7 @@ except ImportError:
     # dotenv not available, continue without it
     pass
 
-from transcript_enhancer import TranscriptEnhancer
+from transcript_enhancer import get_enhancer
 from transcript_parser import TranscriptSegment
 from config import Config
 
@@ -35,19 +35,20 @@ def test_large_context():
     print("✅ API key found")
     
     # Create test configuration with large context
-    config = Config()
-    config.enable_llm_enhancement = True
-    config.enhancement_level = "detailed"
-    config.enable_batching = True
-    config.batch_target_tokens = 1000  # Test with 1000 tokens
-    config.max_tokens_per_request = 4000  # Allow large responses
-    config.max_cost_per_video = 2.0  # Reasonable cost limit for testing
-    config.cache_enhanced_results = False
+    config = Config(
+        enable_llm_enhancement=True,
+        enhancement_level="detailed",
+        enable_batching=True,
+        batch_target_tokens=1000,  # Test with 1000 tokens
+        max_tokens_per_request=4000,  # Allow large responses
+        max_cost_per_video=2.0,  # Reasonable cost limit for testing
+        cache_enhanced_results=False
+    )
     
     try:
         # Initialize transcript enhancer
         print("Initializing transcript enhancer with large context...")
-        enhancer = TranscriptEnhancer(config)
+        enhancer = get_enhancer(config)
         print("✅ Transcript enhancer initialized successfully")
         
         # Create test transcript segments with longer content
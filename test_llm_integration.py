@@ -6,6 +6,7 @@ Tests the transcript enhancer functionality
 
 import os
 import sys
+from dataclasses import replace
 
 # Load environment variables from .env file
 try:
@@ -15,7 +16,7 @@ except ImportError:
     # dotenv not available, continue without it
     pass
 
-from transcript_enhancer import TranscriptEnhancer
+from transcript_enhancer import get_enhancer
 from transcript_parser import TranscriptSegment
 from config import Config
 
@@ -45,16 +46,17 @@ def test_llm_integration():
     print("✅ API key found")
     
     # Create test configuration
-    config = Config()
-    config.enable_llm_enhancement = True
-    config.enhancement_level = "basic"
-    config.max_cost_per_video = 1.0  # Low cost limit for testing
-    config.cache_enhanced_results = False
+    config = Config(
+        enable_llm_enhancement=True,
+        enhancement_level="basic",
+        max_cost_per_video=1.0,  # Low cost limit for testing
+        cache_enhanced_results=False
+    )
     
     try:
         # Initialize transcript enhancer
         print("Initializing transcript enhancer...")
-        enhancer = TranscriptEnhancer(config)
+        enhancer = get_enhancer(config)
         print("✅ Transcript enhancer initialized successfully")
         
         # Create test transcript segments
@@ -148,10 +150,13 @@ def test_configuration():
         print(f"Default max_cost_per_video: ${config.max_cost_per_video}")
         print(f"Default anthropic_model: {config.anthropic_model}")
         
-        # Test setting LLM options
-        config.enable_llm_enhancement = True
-        config.enhancement_level = "academic"
-        config.max_cost_per_video = 10.0
+        # Test overriding LLM options via dataclasses.replace
+        config = replace(
+            config,
+            enable_llm_enhancement=True,
+            enhancement_level="academic",
+            max_cost_per_video=10.0
+        )
         
         print(f"Modified enable_llm_enhancement: {config.enable_llm_enhancement}")
         print(f"Modified enhancement_level: {config.enhancement_level}")
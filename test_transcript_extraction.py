@@ -25,9 +25,8 @@ def test_transcript_extraction(youtube_url: str):
     print("=" * 50)
     
     # Create test configuration
-    config = Config()
-    config.output_directory = "test_output"
-    os.makedirs(config.output_directory, exist_ok=True)
+    config = Config(output_directory="test_output")
+    config.ensure_dirs()
     
     try:
         # Initialize components
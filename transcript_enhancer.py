@@ -3,15 +3,26 @@ Transcript enhancer module for YouTube Presentation Extractor
 Handles LLM interactions with Anthropic Claude for transcript enhancement
 """
 
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
 import os
 import json
+import random
+import sqlite3
+import threading
 import time
 import re
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple, Union
+from dataclasses import asdict, dataclass
 from pathlib import Path
 import anthropic
-from anthropic import Anthropic
+import httpx
+from anthropic import Anthropic, AsyncAnthropic
 import logging
 
 # Load environment variables from .env file
@@ -26,6 +37,43 @@ from config import Config
 from transcript_parser import TranscriptSegment
 
 
+# Module-level logger; configuring handlers (basicConfig) is left to the
+# application so importing or constructing an enhancer never rewires
+# global logging
+logger = logging.getLogger(__name__)
+
+
+class CostLimitExceeded(Exception):
+    """Raised when streamed output pushes spend past max_cost_per_video."""
+
+
+# Spoken filler that can be dropped from LLM payloads without losing
+# meaning. "like" is deliberately absent — it is usually load-bearing
+# ("I like", "looks like") and too risky to strip blindly
+_FILLER_RE = re.compile(r'\b(?:um+|uh+|you know|i mean|so basically)\b,?\s*',
+                        re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+# Sentence boundary for redistributing enhanced text across segments;
+# compiled once rather than per batch
+_SENT_SPLIT = re.compile(r'[.!?]+')
+# Markdown code fence around a JSON batch response
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+# Structured enhancement response: body between the text marker and the
+# key-points marker (or end of response), points after it. One search
+# replaces the chain of str.split passes over the same response
+_RESP_RE = re.compile(
+    r'(?:ENHANCED_TEXT:|ACADEMIC_TEXT:)(?P<body>.*?)'
+    r'(?:KEY_POINTS:|KEY_CONCEPTS:|\Z)(?P<points>.*)',
+    re.DOTALL,
+)
+# One key point per line: bullet lines yield their content, bare prose
+# lines pass through, section-marker lines are skipped
+_KEY_POINT_RE = re.compile(
+    r'^[ \t]*(?:[-•*][ \t]*|(?!KEY_POINTS:|KEY_CONCEPTS:|[-•*]))(\S[^\n]*?)[ \t\r]*$',
+    re.MULTILINE,
+)
+
+
 @dataclass
 class EnhancementResult:
     """Result of transcript enhancement."""
@@ -47,6 +95,7 @@ class EnhancementStats:
     total_cost: float
     processing_time: float
     errors: List[str]
+    tokens_saved: int = 0  # Input tokens avoided by filler stripping
 
 
 class TranscriptEnhancer:
@@ -55,37 +104,194 @@ class TranscriptEnhancer:
     def __init__(self, config: Config):
         self.config = config
         self.client = None
+        self.async_client = None
         self.stats = EnhancementStats(0, 0, 0, 0.0, 0.0, [])
-        self.cache = {}
-        
-        # Setup logging first
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        # Insertion-ordered so the LRU helpers below can evict the oldest
+        # entry in O(1) once cache_max_entries is reached
+        self.cache: OrderedDict = OrderedDict()
+        # On-disk backing store, opened by load_cache; None keeps the cache
+        # memory-only. _cache_put runs on worker threads (slide enhancement
+        # fans out through a ThreadPoolExecutor), so the connection is
+        # shared across threads and every use holds this lock
+        self._cache_db: Optional[sqlite3.Connection] = None
+        self._cache_db_lock = threading.Lock()
+        # Default estimation ratio; recalibrated against the real tokenizer
+        # per transcript (see _calibrate_token_ratio)
+        self._chars_per_token = 3.5
+        # Set once the cost ceiling is hit so in-flight sibling batches can
+        # bail out before issuing their own API calls
+        self._cost_exceeded: Optional[asyncio.Event] = None
         
+        self.logger = logger
+
         # Initialize Anthropic client
         self._initialize_client()
     
     def _initialize_client(self):
-        """Initialize Anthropic client with API key."""
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable not found")
-        
+        """Initialize Anthropic clients, one per available API key.
+
+        ANTHROPIC_API_KEYS (comma-separated) spreads batches across several
+        keys/workspaces, multiplying the effective rate-limit ceiling; a
+        single ANTHROPIC_API_KEY keeps the usual one-client setup.
+        """
+        keys_env = os.getenv('ANTHROPIC_API_KEYS', '')
+        api_keys = [key.strip() for key in keys_env.split(',') if key.strip()]
+        if not api_keys:
+            api_key = os.getenv('ANTHROPIC_API_KEY')
+            if not api_key:
+                raise ValueError("ANTHROPIC_API_KEY environment variable not found")
+            api_keys = [api_key]
+
         try:
-            self.client = Anthropic(api_key=api_key)
-            print("Anthropic client initialized successfully")
+            # Opt in to prompt caching so the shared instruction block is
+            # billed once and reused across batches
+            headers = {"anthropic-beta": "prompt-caching-2024-07-31"}
+            # Size the connection pool for the concurrent dispatcher and keep
+            # connections alive across batches so every request after the
+            # first reuses the same TLS session instead of re-handshaking
+            limits = httpx.Limits(
+                max_connections=self.config.max_concurrent_requests * 2,
+                max_keepalive_connections=self.config.max_concurrent_requests,
+                keepalive_expiry=120.0,
+            )
+            timeout = httpx.Timeout(120.0)
+            self.client = Anthropic(
+                api_key=api_keys[0], default_headers=headers,
+                http_client=httpx.Client(limits=limits, timeout=timeout),
+            )
+            # Async siblings for the concurrent batch dispatcher; stats are
+            # aggregated on this instance regardless of which key served a
+            # batch
+            self._async_clients = [
+                AsyncAnthropic(
+                    api_key=key, default_headers=headers,
+                    http_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+                )
+                for key in api_keys
+            ]
+            self.async_client = self._async_clients[0]
+            if len(api_keys) > 1:
+                print(f"Anthropic client initialized successfully ({len(api_keys)} API keys)")
+            else:
+                print("Anthropic client initialized successfully")
         except Exception as e:
             raise Exception(f"Failed to initialize Anthropic client: {e}")
     
     def _estimate_tokens(self, text: str) -> int:
         """
         Estimate token count for text.
-        Rough approximation: 1 token ≈ 4 characters for English text.
-        For more accurate estimation, we can use a slightly more conservative ratio.
+        The ratio starts at the conservative 1 token ≈ 3.5 characters and is
+        recalibrated against Anthropic's token-counting endpoint once per
+        transcript, so code- or URL-heavy text no longer needs manual tuning.
+
+        O(1): str objects carry their length, so no characters are scanned.
+        _create_batches estimates each segment exactly once up front.
+        """
+        # int() keeps the return type honest: floor-dividing by the float
+        # ratio yields a float, which leaks into token sums and comparisons
+        return max(1, int(len(text) / self._chars_per_token))
+
+    def _calibrate_token_ratio(self, segments: List[TranscriptSegment]):
+        """Calibrate the chars-per-token ratio against the real tokenizer.
+
+        One count_tokens call on a sample of the actual transcript replaces
+        the fixed chars/3.5 guess, which is systematically off for text
+        heavy in code, URLs or non-English words. Any failure keeps the
+        existing ratio, so batching never depends on this call succeeding.
         """
-        # More conservative estimation: 1 token ≈ 3.5 characters
-        return max(1, len(text) // 3.5)
+        if self.client is None:
+            return
+
+        sample = self._combine_batch_text(segments)[:20000]
+        if len(sample) < 200:
+            # Too little text for the ratio to mean anything
+            return
+
+        try:
+            count = self.client.messages.count_tokens(
+                model=self.config.anthropic_model,
+                messages=[{"role": "user", "content": sample}],
+            )
+            if count.input_tokens > 0:
+                self._chars_per_token = len(sample) / count.input_tokens
+                self.logger.info(
+                    "Token ratio calibrated: %.2f chars/token",
+                    self._chars_per_token)
+        except Exception as e:
+            self.logger.warning("Token-count calibration failed, "
+                                "keeping %.2f chars/token: %s",
+                                self._chars_per_token, e)
     
+    def _cache_key(self, text: str, enhancement_level: str) -> str:
+        """Build a stable cache key for one enhancement request.
+
+        Hashing keeps the persisted cache file small (keys no longer embed
+        whole transcripts), and folding in the model name and prompt style
+        means results produced under one configuration are never served
+        for another.
+        """
+        payload = (f"{text}|{enhancement_level}"
+                   f"|{self._model_for_level(enhancement_level)}"
+                   f"|{self.config.prompt_style}")
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _cache_get(self, cache_key: str):
+        """Return the cached value for a key, or None.
+
+        A hit is moved to the end of the OrderedDict so eviction always
+        targets the least recently used entry.
+        """
+        if not self.config.cache_enhanced_results:
+            return None
+        value = self.cache.get(cache_key)
+        if value is not None:
+            self.cache.move_to_end(cache_key)
+        return value
+
+    def _cache_put(self, cache_key: str, value):
+        """Store a value, evicting the least recently used entries past the cap.
+
+        Without a cap the cache grows with every distinct segment ever
+        enhanced in the process; long batch runs would hold whole enhanced
+        transcripts in memory indefinitely.
+        """
+        if not self.config.cache_enhanced_results:
+            return
+        self.cache[cache_key] = value
+        self.cache.move_to_end(cache_key)
+        max_entries = self.config.cache_max_entries
+        if max_entries > 0:
+            while len(self.cache) > max_entries:
+                self.cache.popitem(last=False)
+        # Persist as a single-row upsert so every entry survives a crash;
+        # the LRU cap applies only to the in-memory layer
+        if self._cache_db is not None:
+            try:
+                with self._cache_db_lock:
+                    self._cache_db.execute(
+                        "INSERT OR REPLACE INTO enhancement_cache "
+                        "(cache_key, value, created_at) "
+                        "VALUES (?, ?, strftime('%s', 'now'))",
+                        (cache_key, json.dumps(self._serialize_cache_value(value))),
+                    )
+                    self._cache_db.commit()
+            except sqlite3.Error as e:
+                self.logger.warning("Failed to persist cache entry: %s", e)
+
+    @staticmethod
+    def _serialize_cache_value(value):
+        """Make a cache value JSON-safe; EnhancementResults become dicts."""
+        return asdict(value) if isinstance(value, EnhancementResult) else value
+
+    @staticmethod
+    def _deserialize_cache_value(value):
+        """Inverse of _serialize_cache_value.
+
+        Dicts come from the per-segment path (EnhancementResult); lists and
+        strings from the batch paths pass through unchanged.
+        """
+        return EnhancementResult(**value) if isinstance(value, dict) else value
+
     def _create_batches(self, segments: List[TranscriptSegment], target_tokens: int = None) -> List[List[TranscriptSegment]]:
         """
         Create batches of segments that approximately match the target token count.
@@ -103,37 +309,87 @@ class TranscriptEnhancer:
         if not self.config.enable_batching:
             # Return each segment as its own batch
             return [[segment] for segment in segments]
-        
-        batches = []
-        current_batch = []
-        current_tokens = 0
-        
-        # Allow much more flexibility in batch size (up to 50% over target)
-        # This ensures we get closer to the target token count
-        max_tokens = int(target_tokens * 1.5)
-        min_tokens = int(target_tokens * 0.7)  # Don't create batches that are too small
-        
-        for segment in segments:
-            segment_tokens = self._estimate_tokens(segment.text)
-            
-            # If adding this segment would exceed max_tokens and we have a substantial batch, start new batch
-            if current_tokens + segment_tokens > max_tokens and current_tokens >= min_tokens:
-                batches.append(current_batch)
-                current_batch = [segment]
-                current_tokens = segment_tokens
+
+        if not segments:
+            return []
+
+        # The 50% slack this used to carry compensated for the fixed
+        # chars/3.5 token guess. Estimates are now calibrated against the
+        # real tokenizer per transcript (_calibrate_token_ratio), so only
+        # batch_overlap_tolerance remains as headroom for the residual
+        # per-batch variance of a global ratio
+        capacity = int(target_tokens * (1 + self.config.batch_overlap_tolerance))
+
+        # First-Fit-Decreasing bin packing: place the largest segments
+        # first, each into the earliest batch with room left, so the batch
+        # count approaches the minimum for the capacity. The contiguous
+        # greedy fill this replaces flushed early whenever a large segment
+        # arrived, leaving batches well under target and inflating the
+        # number of API round-trips
+        n = len(segments)
+        tokens = np.fromiter(
+            (self._estimate_tokens(seg.text) for seg in segments),
+            dtype=np.int64, count=n,
+        )
+        order = np.argsort(-tokens, kind='stable')
+
+        bin_indices: List[List[int]] = []
+        bin_room: List[int] = []
+        for i in order.tolist():
+            size = int(tokens[i])
+            for b, room in enumerate(bin_room):
+                if size <= room:
+                    bin_indices[b].append(i)
+                    bin_room[b] = room - size
+                    break
             else:
-                current_batch.append(segment)
-                current_tokens += segment_tokens
-        
-        # Add the last batch if it has content
-        if current_batch:
-            batches.append(current_batch)
-        
-        return batches
+                # No batch has room (or the segment alone exceeds capacity):
+                # open a new one
+                bin_indices.append([i])
+                bin_room.append(capacity - size)
+
+        # Chronological order inside each batch, and batches ordered by
+        # their earliest segment; the indexed JSON round-trip maps each
+        # enhanced text back to its segment regardless of contiguity
+        for indices in bin_indices:
+            indices.sort()
+        bin_indices.sort(key=lambda indices: indices[0])
+
+        return [[segments[i] for i in indices] for indices in bin_indices]
     
     def _combine_batch_text(self, segments: List[TranscriptSegment]) -> str:
         """Combine text from multiple segments into a single string."""
-        return " ".join([seg.text for seg in segments])
+        # Generator feed: join sizes its buffer without an intermediate list
+        return " ".join(seg.text for seg in segments)
+
+    def _combine_batch_json(self, segments: List[TranscriptSegment]) -> str:
+        """Encode a batch as an indexed JSON array for the model.
+
+        Keeping segments as {"i": index, "t": text} objects preserves
+        segment boundaries through the round-trip, so enhanced text maps
+        back to its segment exactly instead of being re-split from prose.
+        """
+        return json.dumps(
+            [{"i": i, "t": self._compress_for_llm(seg.text)}
+             for i, seg in enumerate(segments)],
+            ensure_ascii=False,
+        )
+
+    def _compress_for_llm(self, text: str) -> str:
+        """Strip spoken filler and collapse whitespace before dispatch.
+
+        Auto-captions are dense with "um"/"uh"/"you know"; dropping those
+        trims input tokens at no information cost. Savings accumulate in
+        stats.tokens_saved. Cache keys and original_text always keep the
+        raw transcript.
+        """
+        compressed = _FILLER_RE.sub('', text)
+        compressed = _WHITESPACE_RE.sub(' ', compressed).strip()
+
+        saved = self._estimate_tokens(text) - self._estimate_tokens(compressed)
+        if saved > 0:
+            self.stats.tokens_saved += saved
+        return compressed
     
     def _distribute_enhanced_text(self, enhanced_text: str, segments: List[TranscriptSegment]) -> List[str]:
         """
@@ -144,29 +400,20 @@ class TranscriptEnhancer:
             return []
         
         # Simple approach: split enhanced text by sentences and distribute
-        sentences = re.split(r'[.!?]+', enhanced_text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        # Distribute sentences to segments
-        enhanced_segments = []
-        sentences_per_segment = len(sentences) // len(segments)
-        remainder = len(sentences) % len(segments)
-        
-        sentence_index = 0
-        for i, segment in enumerate(segments):
-            # Calculate how many sentences this segment gets
-            num_sentences = sentences_per_segment + (1 if i < remainder else 0)
-            
-            if sentence_index < len(sentences):
-                segment_sentences = sentences[sentence_index:sentence_index + num_sentences]
-                enhanced_text = ". ".join(segment_sentences) + "."
-                enhanced_segments.append(enhanced_text)
-                sentence_index += num_sentences
-            else:
-                # Fallback to original text if not enough sentences
-                enhanced_segments.append(segment.text)
-        
-        return enhanced_segments
+        # (strip once, inside the generator)
+        sentences = [s for s in (p.strip() for p in _SENT_SPLIT.split(enhanced_text)) if s]
+
+        # One linspace gives every slice boundary up front (consecutive
+        # counts differ by at most one), replacing the per-segment
+        # index bookkeeping of the old remainder loop
+        offsets = np.linspace(0, len(sentences), len(segments) + 1, dtype=int)
+        return [
+            ". ".join(sentences[offsets[i]:offsets[i + 1]]) + "."
+            if offsets[i + 1] > offsets[i]
+            # Fallback to original text if not enough sentences
+            else segment.text
+            for i, segment in enumerate(segments)
+        ]
     
     def enhance_transcript_segment(self, segment: TranscriptSegment, 
                                  enhancement_level: str = "detailed") -> EnhancementResult:
@@ -181,31 +428,39 @@ class TranscriptEnhancer:
             EnhancementResult with enhanced content
         """
         # Check cache first
-        cache_key = f"{segment.text}_{enhancement_level}"
-        if cache_key in self.cache and self.config.cache_enhanced_results:
-            return self.cache[cache_key]
-        
-        # Get appropriate prompt
-        prompt = self._get_enhancement_prompt(segment.text, enhancement_level)
+        cache_key = self._cache_key(segment.text, enhancement_level)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
+        # Cached system instructions plus the per-segment transcript
+        system, user_text = self._get_enhancement_messages(
+            self._compress_for_llm(segment.text), enhancement_level)
+
         try:
             # Call Claude API
-            response = self._call_claude_api(prompt, enhancement_level)
-            
+            response, usage = self._call_claude_api(user_text, enhancement_level,
+                                                    system=system)
+
             # Parse response
             result = self._parse_enhancement_response(response, segment.text)
-            
+
+            # Replace the parser's estimates with the API's own numbers
+            if usage is not None:
+                result.tokens_used = self._usage_tokens(usage)
+                result.cost = self._usage_cost(
+                    usage, self._model_for_level(enhancement_level))
+
             # Update stats
             self._update_stats(result.tokens_used, result.cost)
             
             # Cache result
-            if self.config.cache_enhanced_results:
-                self.cache[cache_key] = result
-            
+            self._cache_put(cache_key, result)
+
             return result
             
         except Exception as e:
-            self.logger.error(f"Failed to enhance segment: {e}")
+            self.logger.error("Failed to enhance segment: %s", e)
             self.stats.errors.append(str(e))
             
             # Return fallback result
@@ -219,118 +474,335 @@ class TranscriptEnhancer:
                 cost=0.0
             )
     
-    def enhance_full_transcript(self, segments: List[TranscriptSegment], 
+    def enhance_full_transcript(self, segments: List[TranscriptSegment],
                               enhancement_level: str = "detailed") -> List[EnhancementResult]:
         """
         Enhance all transcript segments using batching for efficiency.
-        
+
+        Works in sync-only environments too: when the caller already has
+        an event loop running (a notebook, another async framework) —
+        where asyncio.run would raise — the coroutine is driven to
+        completion on a worker thread with its own loop, keeping the
+        concurrent dispatch either way.
+
         Args:
             segments: List of transcript segments
             enhancement_level: Level of enhancement
-            
+
         Returns:
             List of EnhancementResult objects
         """
+        coro = self.enhance_full_transcript_async(segments, enhancement_level)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, coro).result()
+
+    async def enhance_full_transcript_async(self, segments: List[TranscriptSegment],
+                                            enhancement_level: str = "detailed") -> List[EnhancementResult]:
+        """
+        Enhance all transcript segments, dispatching batches concurrently.
+
+        Each batch is an independent API round-trip, so the whole run is
+        network-latency-bound; issuing up to config.max_concurrent_requests
+        batches at once makes total wall-clock scale with the slowest batch
+        rather than the sum of all of them.
+
+        Args:
+            segments: List of transcript segments
+            enhancement_level: Level of enhancement
+
+        Returns:
+            List of EnhancementResult objects, in segment order
+        """
         self.stats = EnhancementStats(0, 0, 0, 0.0, 0.0, [])
         self.stats.total_segments = len(segments)
-        
+
         start_time = time.time()
-        results = []
-        
+
         print(f"Enhancing {len(segments)} transcript segments using batching...")
-        
+
+        # Anchor token estimates to the real tokenizer before batching
+        self._calibrate_token_ratio(segments)
+
         # Create batches using config target tokens
         batches = self._create_batches(segments)
         print(f"Created {len(batches)} batches for processing")
-        
-        for batch_idx, batch in enumerate(batches):
-            print(f"Processing batch {batch_idx + 1}/{len(batches)} ({len(batch)} segments)...")
-            
-            # Combine batch text
-            batch_text = self._combine_batch_text(batch)
-            batch_tokens = self._estimate_tokens(batch_text)
-            
-            print(f"  Batch tokens: ~{batch_tokens}")
-            
-            # Check cache for batch
-            cache_key = f"{batch_text}_{enhancement_level}"
-            if cache_key in self.cache and self.config.cache_enhanced_results:
-                enhanced_batch_text = self.cache[cache_key]
-                print("  Using cached result")
-            else:
-                # Get enhancement prompt for batch
-                prompt = self._get_enhancement_prompt(batch_text, enhancement_level)
-                
-                try:
-                    # Call Claude API for batch
-                    response = self._call_claude_api(prompt, enhancement_level)
-                    
-                    # Parse response
-                    enhanced_batch_text = self._parse_enhanced_text(response)
-                    
-                    # Cache result
-                    if self.config.cache_enhanced_results:
-                        self.cache[cache_key] = enhanced_batch_text
-                    
-                    # Update stats
-                    tokens_used = self._estimate_tokens(response)
-                    cost = (tokens_used / 1000) * 0.003  # Approximate cost
-                    self._update_stats(tokens_used, cost)
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to enhance batch {batch_idx + 1}: {e}")
-                    self.stats.errors.append(str(e))
-                    # Use original text as fallback
-                    enhanced_batch_text = batch_text
-            
-            # Distribute enhanced text back to individual segments
-            enhanced_segments = self._distribute_enhanced_text(enhanced_batch_text, batch)
-            
-            # Create results for each segment in the batch
-            for i, segment in enumerate(batch):
-                enhanced_text = enhanced_segments[i] if i < len(enhanced_segments) else segment.text
-                
-                result = EnhancementResult(
-                    original_text=segment.text,
-                    enhanced_text=enhanced_text,
-                    key_points=[],  # Will be extracted separately if needed
-                    summary=self._generate_summary(enhanced_text),
-                    confidence=0.9,
-                    tokens_used=0,  # Already counted in batch
-                    cost=0.0  # Already counted in batch
+
+        # Identical batches (repeated intros, silence filler) collapse to a
+        # single API call; results fan back out by cache key afterwards
+        batch_keys = [
+            self._cache_key(self._combine_batch_text(batch), enhancement_level)
+            for batch in batches
+        ]
+        unique_indices: Dict[str, int] = {}
+        for idx, key in enumerate(batch_keys):
+            unique_indices.setdefault(key, idx)
+        unique_batches = [batches[idx] for idx in unique_indices.values()]
+        if len(unique_batches) < len(batches):
+            print(f"Deduplicated {len(batches) - len(unique_batches)} "
+                  f"identical batches")
+
+        if self.config.use_message_batches:
+            # Offline pricing: one submitted job covers every batch
+            unique_outcomes = await self._enhance_via_message_batches(
+                unique_batches, enhancement_level)
+        else:
+            self._cost_exceeded = asyncio.Event()
+            semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+            tasks = [
+                asyncio.create_task(
+                    self._enhance_batch_async(batch_idx, len(unique_batches),
+                                              batch, enhancement_level, semaphore)
                 )
-                
-                results.append(result)
-            
-            # Check cost limits
-            if self.config.max_cost_per_video > 0 and self.stats.total_cost > self.config.max_cost_per_video:
-                print(f"Cost limit reached (${self.stats.total_cost:.2f}). Stopping enhancement.")
-                break
-            
-            # Rate limiting
-            time.sleep(0.1)  # Small delay to avoid rate limits
-        
+                for batch_idx, batch in enumerate(unique_batches)
+            ]
+            unique_outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        outcomes_by_key = dict(zip(unique_indices, unique_outcomes))
+        outcomes = [outcomes_by_key[key] for key in batch_keys]
+
+        results = []
+        for batch_idx, (batch, outcome) in enumerate(zip(batches, outcomes)):
+            if isinstance(outcome, BaseException):
+                self.logger.error("Failed to enhance batch %d: %s",
+                                  batch_idx + 1, outcome)
+                self.stats.errors.append(str(outcome))
+                # Use original text as fallback
+                enhanced = self._combine_batch_text(batch)
+            else:
+                enhanced = outcome
+
+            results.extend(self._build_batch_results(batch, enhanced))
+
         self.stats.processing_time = time.time() - start_time
         self.stats.enhanced_segments = len(results)
-        
+
         print(f"Enhancement completed: {self.stats.enhanced_segments} segments, "
               f"${self.stats.total_cost:.2f} cost, {self.stats.processing_time:.1f}s")
-        
+        if self.stats.tokens_saved:
+            print(f"Filler stripping saved ~{self.stats.tokens_saved} input tokens")
+
+        return results
+
+    async def _enhance_batch_async(self, batch_idx: int, total_batches: int,
+                                   batch: List[TranscriptSegment],
+                                   enhancement_level: str,
+                                   semaphore: asyncio.Semaphore) -> Union[List[str], str]:
+        """Enhance one batch.
+
+        Returns per-segment enhanced texts (a list) from the indexed JSON
+        path, or a single enhanced blob (a string) from the custom-template
+        path; _build_batch_results accepts either.
+        """
+        batch_text = self._combine_batch_text(batch)
+
+        # Check cache for batch
+        cache_key = self._cache_key(batch_text, enhancement_level)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            print(f"Batch {batch_idx + 1}/{total_batches}: using cached result")
+            return cached
+
+        async with semaphore:
+            # Batches that queued behind the semaphore may find the budget
+            # already spent by the ones that ran first
+            if self._cost_exceeded is not None and self._cost_exceeded.is_set():
+                print(f"Cost limit reached. Skipping batch {batch_idx + 1}/{total_batches}.")
+                return batch_text
+            if (self.config.max_cost_per_video > 0
+                    and self.stats.total_cost > self.config.max_cost_per_video):
+                print(f"Cost limit reached (${self.stats.total_cost:.2f}). "
+                      f"Skipping batch {batch_idx + 1}/{total_batches}.")
+                return batch_text
+
+            batch_tokens = self._estimate_tokens(batch_text)
+            print(f"Processing batch {batch_idx + 1}/{total_batches} "
+                  f"({len(batch)} segments, ~{batch_tokens} tokens)...")
+
+            if self.config.custom_prompt_template:
+                # Custom templates expect prose in and prose out
+                system, user_text = self._get_enhancement_messages(
+                    self._compress_for_llm(batch_text), enhancement_level)
+            else:
+                # Indexed JSON keeps segment boundaries through the round-trip
+                system, user_text = self._get_batch_messages(batch, enhancement_level)
+
+            # Call Claude API for batch, rotating across the key pool
+            client = self._async_clients[batch_idx % len(self._async_clients)]
+            response, usage = await self._call_claude_api_async(
+                user_text, enhancement_level, system=system, client=client)
+
+            # Parse response
+            if self.config.custom_prompt_template:
+                enhanced: Union[List[str], str] = self._parse_enhanced_text(response)
+            else:
+                enhanced = self._parse_batch_response(response, batch)
+
+            # Cache result
+            self._cache_put(cache_key, enhanced)
+
+            # Update stats from the API's reported usage; fall back to the
+            # char-ratio estimate only if the SDK returned none
+            if usage is not None:
+                tokens_used = self._usage_tokens(usage)
+                cost = self._usage_cost(
+                    usage, self._model_for_level(enhancement_level))
+            else:
+                tokens_used = self._estimate_tokens(response)
+                cost = (tokens_used / 1000) * 0.003
+            self._update_stats(tokens_used, cost)
+
+            return enhanced
+
+    async def _enhance_via_message_batches(self, batches: List[List[TranscriptSegment]],
+                                           enhancement_level: str) -> List:
+        """Run every batch through Anthropic's Message Batches API.
+
+        Full-transcript enhancement is an offline workload — nobody is
+        waiting on a per-request deadline — so it qualifies for batch
+        pricing at half the real-time rate and a far higher throughput
+        ceiling. One submitted job carries all batches; completion is
+        polled with a growing sleep.
+
+        Returns one outcome per input batch: an enhanced value on success
+        or an Exception, matching what asyncio.gather hands the caller on
+        the real-time path.
+        """
+        outcomes: List = [None] * len(batches)
+        requests = []
+        pending = {}  # custom_id -> (batch index, cache key)
+
+        for idx, batch in enumerate(batches):
+            batch_text = self._combine_batch_text(batch)
+            cache_key = self._cache_key(batch_text, enhancement_level)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                outcomes[idx] = cached
+                continue
+
+            if self.config.custom_prompt_template:
+                system, user_text = self._get_enhancement_messages(
+                    self._compress_for_llm(batch_text), enhancement_level)
+            else:
+                system, user_text = self._get_batch_messages(batch, enhancement_level)
+
+            custom_id = f"batch-{idx}"
+            pending[custom_id] = (idx, cache_key)
+            requests.append({
+                "custom_id": custom_id,
+                "params": self._build_request_kwargs(
+                    user_text, system, self._model_for_level(enhancement_level)),
+            })
+
+        if not requests:
+            return outcomes
+
+        job = await self.async_client.messages.batches.create(requests=requests)
+        print(f"Submitted message batch {job.id} ({len(requests)} requests); "
+              f"polling for completion...")
+
+        delay = 5.0
+        while job.processing_status not in ("ended", "canceled", "expired"):
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 60.0)
+            job = await self.async_client.messages.batches.retrieve(job.id)
+
+        async for entry in await self.async_client.messages.batches.results(job.id):
+            if entry.custom_id not in pending:
+                continue
+            idx, cache_key = pending[entry.custom_id]
+
+            if entry.result.type != "succeeded":
+                outcomes[idx] = Exception(
+                    f"Message batch request {entry.custom_id}: {entry.result.type}")
+                continue
+
+            response_text = entry.result.message.content[0].text
+            if self.config.custom_prompt_template:
+                enhanced: Union[List[str], str] = self._parse_enhanced_text(response_text)
+            else:
+                enhanced = self._parse_batch_response(response_text, batches[idx])
+
+            self._cache_put(cache_key, enhanced)
+
+            # Batch API bills at 50% of the real-time rate
+            usage = getattr(entry.result.message, 'usage', None)
+            if usage is not None:
+                tokens_used = self._usage_tokens(usage)
+                cost = self._usage_cost(
+                    usage, self._model_for_level(enhancement_level)) * 0.5
+            else:
+                tokens_used = self._estimate_tokens(response_text)
+                cost = (tokens_used / 1000) * 0.003 * 0.5
+            self._update_stats(tokens_used, cost)
+            outcomes[idx] = enhanced
+
+        for idx, outcome in enumerate(outcomes):
+            if outcome is None:
+                outcomes[idx] = Exception(f"batch-{idx} missing from message batch results")
+
+        return outcomes
+
+    def _build_batch_results(self, batch: List[TranscriptSegment],
+                             enhanced: Union[List[str], str]) -> List[EnhancementResult]:
+        """Turn a batch outcome into per-segment results.
+
+        A list is already one enhanced text per segment; a string blob is
+        split proportionally across the batch.
+        """
+        if isinstance(enhanced, list):
+            enhanced_segments = enhanced
+        else:
+            enhanced_segments = self._distribute_enhanced_text(enhanced, batch)
+
+        results = []
+        for i, segment in enumerate(batch):
+            enhanced_text = enhanced_segments[i] if i < len(enhanced_segments) else segment.text
+
+            results.append(EnhancementResult(
+                original_text=segment.text,
+                enhanced_text=enhanced_text,
+                key_points=[],  # Will be extracted separately if needed
+                summary=self._generate_summary(enhanced_text),
+                confidence=0.9,
+                tokens_used=0,  # Already counted in batch
+                cost=0.0  # Already counted in batch
+            ))
+
         return results
     
     def extract_key_points(self, segments: List[TranscriptSegment]) -> List[str]:
         """
         Extract key points from transcript segments.
-        
+
+        A transcript whose combined text exceeds
+        config.summarization_threshold_tokens no longer goes to the API
+        as one giant prompt (which risks the context window and always
+        bills the full text): the segments are halved recursively until
+        each piece fits, and the per-piece bullet lists are condensed by
+        a final merge prompt.
+
         Args:
             segments: List of transcript segments
-            
+
         Returns:
             List of key points
         """
         # Combine all text
-        full_text = " ".join([seg.text for seg in segments])
-        
+        full_text = " ".join(seg.text for seg in segments)
+
+        threshold = self.config.summarization_threshold_tokens
+        if (threshold > 0 and len(segments) > 1
+                and self._estimate_tokens(full_text) > threshold):
+            mid = len(segments) // 2
+            combined = (self.extract_key_points(segments[:mid])
+                        + self.extract_key_points(segments[mid:]))
+            return self._merge_key_points(combined)
+
         prompt = f"""
 Please extract the key points from this presentation transcript. 
 Focus on the main concepts, important facts, and central ideas.
@@ -343,12 +815,42 @@ Focus on the most important concepts and insights.
 """
         
         try:
-            response = self._call_claude_api(prompt, "basic")
+            response, _ = self._call_claude_api(prompt, "basic")
             key_points = self._parse_key_points(response)
             return key_points
         except Exception as e:
-            self.logger.error(f"Failed to extract key points: {e}")
+            self.logger.error("Failed to extract key points: %s", e)
+            return []
+
+    def _merge_key_points(self, key_points: List[str]) -> List[str]:
+        """Condense bullet lists from consecutive transcript pieces.
+
+        The concatenated lists are returned unchanged if the merge call
+        fails, so chunked extraction degrades to a longer list rather
+        than losing points.
+        """
+        if not key_points:
             return []
+
+        bullet_block = "\n".join(f"- {point}" for point in key_points)
+
+        prompt = f"""
+These key points were extracted from consecutive parts of the same presentation.
+Merge them into a single list: combine duplicates, keep the most important
+concepts, and preserve the original order of ideas.
+
+{bullet_block}
+
+Please provide the merged list of key points, one per line, starting with a bullet point (-).
+"""
+
+        try:
+            response, _ = self._call_claude_api(prompt, "basic")
+            merged = self._parse_key_points(response)
+            return merged or key_points
+        except Exception as e:
+            self.logger.error("Failed to merge key points: %s", e)
+            return key_points
     
     def generate_slide_summary(self, segments: List[TranscriptSegment], 
                              slide_number: int) -> str:
@@ -366,7 +868,7 @@ Focus on the most important concepts and insights.
             return ""
         
         # Combine segment text
-        slide_text = " ".join([seg.text for seg in segments])
+        slide_text = " ".join(seg.text for seg in segments)
         
         prompt = f"""
 Please provide a concise summary of this slide content from a presentation.
@@ -378,11 +880,68 @@ Please provide a brief, clear summary (2-3 sentences) that captures the main poi
 """
         
         try:
-            response = self._call_claude_api(prompt, "basic")
+            response, _ = self._call_claude_api(prompt, "basic")
             return response.strip()
         except Exception as e:
-            self.logger.error(f"Failed to generate slide summary: {e}")
+            self.logger.error("Failed to generate slide summary: %s", e)
             return ""
+
+    def generate_slide_summaries_batched(
+            self, slides: List[Tuple[int, List[TranscriptSegment]]]) -> Dict[int, str]:
+        """Summarize several slides with a single API request.
+
+        Per-slide calls each pay a full round-trip plus prompt overhead;
+        packing the slides into one delimited prompt with a JSON response
+        amortizes both and divides requests-per-minute pressure by the
+        slide count. Slides missing from the response — or the whole
+        batch, if the response is unparseable — fall back to individual
+        generate_slide_summary calls.
+
+        Args:
+            slides: (slide number, transcript segments) pairs
+
+        Returns:
+            Mapping of slide number to summary text
+        """
+        summaries: Dict[int, str] = {}
+        slides = [(number, segments) for number, segments in slides if segments]
+        if not slides:
+            return summaries
+
+        sections = "\n\n".join(
+            f"Slide {number}:\n" + " ".join(seg.text for seg in segments)
+            for number, segments in slides
+        )
+
+        prompt = f"""
+Please provide a brief, clear summary (2-3 sentences) for each of the following
+slides from a presentation.
+
+{sections}
+
+Respond with only a JSON object mapping each slide number to its summary,
+for example {{"1": "...", "2": "..."}}. Include every slide.
+"""
+
+        try:
+            response, _ = self._call_claude_api(prompt, "basic")
+            text = response.strip()
+            if text.startswith("```"):
+                text = _FENCE_RE.sub('', text)
+            parsed = json.loads(text)
+            for number, _segments in slides:
+                summary = parsed.get(str(number))
+                if isinstance(summary, str) and summary.strip():
+                    summaries[number] = summary.strip()
+        except Exception as e:
+            self.logger.warning("Batched slide summary failed, "
+                                "falling back per slide: %s", e)
+
+        for number, segments in slides:
+            if number not in summaries:
+                summaries[number] = self.generate_slide_summary(segments, number)
+
+        return summaries
     
     def _get_enhancement_prompt(self, text: str, level: str) -> str:
         """Get enhancement prompt based on level and configuration."""
@@ -410,6 +969,76 @@ Please provide a brief, clear summary (2-3 sentences) that captures the main poi
         
         return styled_prompt.format(text=text)
     
+    def _get_enhancement_messages(self, text: str, level: str) -> Tuple[Optional[str], str]:
+        """Split a prompt into a (system, user) pair for prompt caching.
+
+        The instruction block is identical for every batch at a given level
+        and style, so it goes into a system block marked with ephemeral
+        cache_control; only the per-batch transcript travels in the uncached
+        user message. Custom templates have no reliable split point, so they
+        fall back to a plain user prompt with no system block.
+        """
+        if self.config.custom_prompt_template:
+            return None, self._get_enhancement_prompt(text, level)
+
+        if level == "basic":
+            base_prompt = self._get_basic_prompt()
+        elif level == "detailed":
+            base_prompt = self._get_detailed_prompt()
+        elif level == "academic":
+            base_prompt = self._get_academic_prompt()
+        else:
+            raise ValueError(f"Unknown enhancement level: {level}")
+
+        styled_prompt = self._apply_prompt_style(base_prompt)
+
+        # Everything around the transcript placeholder is static: the
+        # instructions before it and the response-format directions after it
+        instructions, _, response_format = styled_prompt.partition("Transcript: {text}")
+        system_prompt = (instructions + response_format).strip()
+        return system_prompt, text
+
+    def _get_batch_messages(self, segments: List[TranscriptSegment],
+                            level: str) -> Tuple[str, str]:
+        """Build the (system, user) pair for an indexed JSON batch request."""
+        system_prompt, _ = self._get_enhancement_messages("", level)
+        system_prompt = (
+            f"{system_prompt}\n\n"
+            "The user message is a JSON array of transcript segments, each "
+            '{"i": <index>, "t": <text>}. Instead of the format above, respond '
+            "with only a JSON array of the same length containing objects "
+            '{"i": <index>, "e": <enhanced text>}, preserving every "i". '
+            "Do not merge, drop or reorder segments."
+        )
+        return system_prompt, self._combine_batch_json(segments)
+
+    def _parse_batch_response(self, response: str,
+                              segments: List[TranscriptSegment]) -> List[str]:
+        """Map a JSON-array batch response back onto its segments.
+
+        Unparseable responses fall back to the proportional prose split so a
+        malformed reply degrades to the old behavior instead of failing the
+        batch.
+        """
+        text = response.strip()
+        if text.startswith("```"):
+            # Strip a markdown code fence if the model wrapped its output
+            text = _FENCE_RE.sub('', text)
+
+        enhanced = [seg.text for seg in segments]
+        try:
+            items = json.loads(text)
+            for item in items:
+                i = item.get("i")
+                if isinstance(i, int) and 0 <= i < len(enhanced) and item.get("e"):
+                    enhanced[i] = str(item["e"]).strip()
+            return enhanced
+        except (ValueError, TypeError, AttributeError):
+            self.logger.warning("Batch response was not valid JSON; "
+                                "falling back to prose distribution")
+            return self._distribute_enhanced_text(self._parse_enhanced_text(response),
+                                                  segments)
+
     def _get_basic_prompt(self) -> str:
         """Get basic enhancement prompt template."""
         return """
@@ -501,88 +1130,256 @@ KEY_CONCEPTS: [important concepts and definitions]
     
     def _parse_enhanced_text(self, response: str) -> str:
         """Parse enhanced text from API response."""
-        # Parse based on response format
-        if "ENHANCED_TEXT:" in response:
-            # Detailed format
-            parts = response.split("ENHANCED_TEXT:")
-            if len(parts) > 1:
-                enhanced_part = parts[1].split("KEY_POINTS:")
-                return enhanced_part[0].strip()
-        elif "ACADEMIC_TEXT:" in response:
-            # Academic format
-            parts = response.split("ACADEMIC_TEXT:")
-            if len(parts) > 1:
-                academic_part = parts[1].split("KEY_CONCEPTS:")
-                return academic_part[0].strip()
-        
+        match = _RESP_RE.search(response)
+        if match:
+            # Detailed or academic format
+            return match.group('body').strip()
+
         # Basic format - just enhanced text
         return response.strip()
     
-    def _call_claude_api(self, prompt: str, enhancement_level: str) -> str:
-        """Call Claude API with retry logic."""
-        max_retries = 3
+    def _model_for_level(self, enhancement_level: str) -> str:
+        """Route a request to the cheapest model its level tolerates.
+
+        Basic enhancements and the summary/key-point helpers (which all
+        call at the "basic" level) run on the configured Haiku-class
+        model; detailed and academic work keeps the main model.
+        """
+        if enhancement_level == "basic" and self.config.basic_model:
+            return self.config.basic_model
+        return self.config.anthropic_model
+
+    def _build_request_kwargs(self, prompt: str, system: Optional[str],
+                              model: Optional[str] = None) -> Dict:
+        """Build the messages.create kwargs shared by the sync and async paths."""
+        kwargs = {
+            "model": model or self.config.anthropic_model,
+            "max_tokens": self.config.max_tokens_per_request,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+        if system:
+            # The cache_control marker makes Anthropic reuse this block
+            # across requests (it only engages once the block clears the
+            # provider's minimum cacheable size)
+            kwargs["system"] = [{
+                "type": "text",
+                "text": system,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        return kwargs
+
+    def _log_cache_usage(self, usage):
+        """Log prompt-cache activity so the hit rate is verifiable.
+
+        cache_read_input_tokens means the shared instruction block was
+        served from Anthropic's cache (billed at ~10%);
+        cache_creation_input_tokens means this request paid to write it.
+        """
+        cache_read = getattr(usage, 'cache_read_input_tokens', None) or 0
+        cache_created = getattr(usage, 'cache_creation_input_tokens', None) or 0
+        if cache_read or cache_created:
+            self.logger.info("Prompt cache: %d tokens read, %d tokens written",
+                             cache_read, cache_created)
+
+    @staticmethod
+    def _usage_tokens(usage) -> int:
+        """Total billed tokens reported by the API for one response."""
+        return sum(
+            getattr(usage, field, 0) or 0
+            for field in ('input_tokens', 'output_tokens',
+                          'cache_read_input_tokens', 'cache_creation_input_tokens')
+        )
+
+    def _usage_cost(self, usage, model: Optional[str] = None) -> float:
+        """Dollar cost of one response from its reported token usage.
+
+        Cache reads bill at 10% of the input rate and cache writes at
+        125%, per Anthropic's prompt-caching pricing. Requests routed to
+        the basic model are priced at its (much lower) rates.
+        """
+        if model is not None and model == self.config.basic_model:
+            in_rate = self.config.basic_model_input_price / 1e6
+            out_rate = self.config.basic_model_output_price / 1e6
+        else:
+            in_rate = self.config.model_input_price / 1e6
+            out_rate = self.config.model_output_price / 1e6
+        return ((getattr(usage, 'input_tokens', 0) or 0) * in_rate
+                + (getattr(usage, 'cache_read_input_tokens', 0) or 0) * in_rate * 0.1
+                + (getattr(usage, 'cache_creation_input_tokens', 0) or 0) * in_rate * 1.25
+                + (getattr(usage, 'output_tokens', 0) or 0) * out_rate)
+
+    @staticmethod
+    def _is_transient_status(status_code: Optional[int]) -> bool:
+        """Whether an HTTP status is worth retrying.
+
+        Request timeouts (408), rate limits (429), Anthropic's overloaded
+        signal (529) and server-side 5xx errors clear on their own; any
+        other 4xx means the request itself is bad.
+        """
+        if status_code is None:
+            return False
+        return status_code in (408, 429, 529) or 500 <= status_code < 600
+
+    @staticmethod
+    def _retry_wait(attempt: int) -> float:
+        """Exponential backoff with jitter: ~1s, ~2s, ~4s, ..."""
+        return 2 ** attempt + random.uniform(0.0, 1.0)
+
+    def _call_claude_api(self, prompt: str, enhancement_level: str,
+                         system: Optional[str] = None) -> Tuple[str, Optional[object]]:
+        """Call Claude API with retry logic, streaming the response.
+
+        Streaming matches the async path: text arrives as it is generated
+        instead of blocking until the full body is buffered server-side,
+        so the caller can start parsing seconds earlier on long
+        enhancements.
+
+        Returns the response text together with the API's usage object
+        (None if the SDK did not report one) so callers account tokens and
+        cost from real numbers instead of re-estimating.
+        """
+        max_retries = self.config.max_retries
         retry_delay = 1
-        
+
         for attempt in range(max_retries):
             try:
-                response = self.client.messages.create(
-                    model=self.config.anthropic_model,
-                    max_tokens=self.config.max_tokens_per_request,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
-                )
-                
-                return response.content[0].text
-                
-            except anthropic.RateLimitError:
+                parts = []
+                with self.client.messages.stream(
+                    **self._build_request_kwargs(
+                        prompt, system, self._model_for_level(enhancement_level))
+                ) as stream:
+                    for text_chunk in stream.text_stream:
+                        parts.append(text_chunk)
+                    final_message = stream.get_final_message()
+
+                usage = getattr(final_message, 'usage', None)
+                if usage is not None:
+                    self._log_cache_usage(usage)
+                return "".join(parts), usage
+
+            except anthropic.APIStatusError as e:
+                # Other 4xx means the request itself is bad; retrying
+                # cannot help
+                if not self._is_transient_status(e.status_code):
+                    raise
                 if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2 ** attempt)
-                    self.logger.warning(f"Rate limited, waiting {wait_time}s...")
+                    wait_time = self._retry_wait(attempt)
+                    self.logger.warning("API returned %d, waiting %.1fs...",
+                                        e.status_code, wait_time)
                     time.sleep(wait_time)
                 else:
                     raise
-                    
+
             except Exception as e:
                 if attempt < max_retries - 1:
-                    self.logger.warning(f"API call failed, retrying... Error: {e}")
-                    time.sleep(retry_delay)
+                    self.logger.warning("API call failed, retrying... Error: %s", e)
+                    time.sleep(retry_delay + random.uniform(0.0, 1.0))
                 else:
                     raise
     
+    async def _call_claude_api_async(self, prompt: str, enhancement_level: str,
+                                     system: Optional[str] = None,
+                                     client: Optional[AsyncAnthropic] = None
+                                     ) -> Tuple[str, Optional[object]]:
+        """Call Claude API asynchronously, streaming the response.
+
+        Streaming lets the running cost be checked as output arrives; once
+        the projected spend crosses max_cost_per_video the stream is
+        abandoned mid-response (saving the remaining output tokens) and
+        CostLimitExceeded tells sibling batches to stand down.
+
+        Returns (response text, usage object or None), matching the sync
+        variant.
+        """
+        if client is None:
+            client = self.async_client
+        max_retries = self.config.max_retries
+        retry_delay = 1
+
+        # Per-token output rate for the model this level routes to, used
+        # to project the running cost from streamed characters via the
+        # calibrated chars-per-token ratio
+        if self._model_for_level(enhancement_level) == self.config.basic_model:
+            output_rate = self.config.basic_model_output_price / 1e6
+        else:
+            output_rate = self.config.model_output_price / 1e6
+
+        for attempt in range(max_retries):
+            try:
+                parts = []
+                streamed_chars = 0
+                async with client.messages.stream(
+                    **self._build_request_kwargs(
+                        prompt, system, self._model_for_level(enhancement_level))
+                ) as stream:
+                    async for text_chunk in stream.text_stream:
+                        parts.append(text_chunk)
+                        streamed_chars += len(text_chunk)
+
+                        if self.config.max_cost_per_video > 0:
+                            running_cost = (streamed_chars / self._chars_per_token
+                                            * output_rate)
+                            if (self.stats.total_cost + running_cost
+                                    > self.config.max_cost_per_video):
+                                if self._cost_exceeded is not None:
+                                    self._cost_exceeded.set()
+                                raise CostLimitExceeded(
+                                    f"Cost limit of ${self.config.max_cost_per_video:.2f} "
+                                    f"reached mid-response; aborting stream"
+                                )
+
+                    final_message = await stream.get_final_message()
+
+                usage = getattr(final_message, 'usage', None)
+                if usage is not None:
+                    self._log_cache_usage(usage)
+                return "".join(parts), usage
+
+            except CostLimitExceeded:
+                # Not a transient failure; retrying would just spend more
+                raise
+
+            except anthropic.APIStatusError as e:
+                # Other 4xx means the request itself is bad; retrying
+                # cannot help
+                if not self._is_transient_status(e.status_code):
+                    raise
+                if attempt < max_retries - 1:
+                    wait_time = self._retry_wait(attempt)
+                    self.logger.warning("API returned %d, waiting %.1fs...",
+                                        e.status_code, wait_time)
+                    await asyncio.sleep(wait_time)
+                else:
+                    raise
+
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    self.logger.warning("API call failed, retrying... Error: %s", e)
+                    await asyncio.sleep(retry_delay + random.uniform(0.0, 1.0))
+                else:
+                    raise
+
     def _parse_enhancement_response(self, response: str, original_text: str) -> EnhancementResult:
         """Parse Claude API response into EnhancementResult."""
-        # Estimate tokens used (rough approximation)
+        # Estimate tokens used (rough approximation; callers overwrite
+        # these with the API's reported usage when it is available)
         tokens_used = self._estimate_tokens(response)
         
         # Calculate cost (approximate)
         cost_per_1k_tokens = 0.003  # Claude-3-Sonnet input cost
         cost = (tokens_used / 1000) * cost_per_1k_tokens
         
-        # Parse based on response format
-        if "ENHANCED_TEXT:" in response:
-            # Detailed format
-            parts = response.split("ENHANCED_TEXT:")
-            if len(parts) > 1:
-                enhanced_part = parts[1].split("KEY_POINTS:")
-                enhanced_text = enhanced_part[0].strip()
-                key_points = self._parse_key_points(enhanced_part[1] if len(enhanced_part) > 1 else "")
-            else:
-                enhanced_text = response.strip()
-                key_points = []
-        elif "ACADEMIC_TEXT:" in response:
-            # Academic format
-            parts = response.split("ACADEMIC_TEXT:")
-            if len(parts) > 1:
-                academic_part = parts[1].split("KEY_CONCEPTS:")
-                enhanced_text = academic_part[0].strip()
-                key_points = self._parse_key_points(academic_part[1] if len(academic_part) > 1 else "")
-            else:
-                enhanced_text = response.strip()
-                key_points = []
+        # Parse based on response format: one regex pass pulls out both the
+        # enhanced body and whatever follows the key-points marker
+        match = _RESP_RE.search(response)
+        if match:
+            enhanced_text = match.group('body').strip()
+            key_points = self._parse_key_points(match.group('points'))
         else:
             # Basic format - just enhanced text
             enhanced_text = response.strip()
@@ -597,38 +1394,32 @@ KEY_CONCEPTS: [important concepts and definitions]
             key_points=key_points,
             summary=summary,
             confidence=0.9,  # High confidence for Claude
-            tokens_used=int(tokens_used),
+            tokens_used=tokens_used,
             cost=cost
         )
     
     def _parse_key_points(self, text: str) -> List[str]:
-        """Parse key points from text."""
+        """Parse key points from text.
+
+        A single multiline findall replaces the per-line strip and
+        startswith chain, keeping the scan inside the C regex engine.
+        """
         if not text:
             return []
-        
-        lines = text.strip().split('\n')
-        key_points = []
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('-') or line.startswith('•') or line.startswith('*'):
-                key_points.append(line[1:].strip())
-            elif line and not line.startswith('KEY_POINTS:') and not line.startswith('KEY_CONCEPTS:'):
-                key_points.append(line)
-        
-        return key_points
+        return _KEY_POINT_RE.findall(text)
     
     def _generate_summary(self, text: str) -> str:
-        """Generate a brief summary of the text."""
+        """Generate a brief summary of the text.
+
+        Called once per segment while assembling batch results, so it
+        only scans up to the first period instead of splitting the whole
+        text into a sentence list it would immediately throw away.
+        """
         if len(text) < 100:
             return text
-        
-        # Simple summary: first sentence or first 100 characters
-        sentences = text.split('.')
-        if sentences:
-            return sentences[0].strip() + '.'
-        
-        return text[:100] + '...'
+
+        # Simple summary: first sentence
+        return text.partition('.')[0].strip() + '.'
     
     def _update_stats(self, tokens: int, cost: float):
         """Update enhancement statistics."""
@@ -644,19 +1435,84 @@ KEY_CONCEPTS: [important concepts and definitions]
         """Clear the enhancement cache."""
         self.cache.clear()
     
+    def _open_cache_db(self, filepath: str) -> sqlite3.Connection:
+        """Open (creating if needed) the SQLite cache at filepath.
+
+        check_same_thread is disabled because inserts arrive from the
+        slide-enhancement worker threads; _cache_db_lock serializes all
+        access to the shared connection.
+        """
+        db = sqlite3.connect(filepath, check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS enhancement_cache ("
+            "cache_key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "created_at INTEGER NOT NULL)"
+        )
+        db.commit()
+        return db
+
     def save_cache(self, filepath: str):
-        """Save cache to file."""
+        """Flush any unpersisted cache entries to the SQLite store.
+
+        When load_cache already opened the store this is just a commit —
+        every _cache_put wrote its own row. The full-dump path only runs
+        for memory-only instances, so saving is no longer an O(cache size)
+        JSON rewrite on every call.
+
+        Safe to call mid-run: errors are logged, never raised, so a disk
+        hiccup cannot stall the enhancement pipeline.
+        """
         try:
-            with open(filepath, 'w') as f:
-                json.dump(self.cache, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Failed to save cache: {e}")
-    
+            with self._cache_db_lock:
+                if self._cache_db is None:
+                    self._cache_db = self._open_cache_db(filepath)
+                    # Snapshot first: flushes can happen while worker tasks
+                    # are still inserting
+                    self._cache_db.executemany(
+                        "INSERT OR REPLACE INTO enhancement_cache "
+                        "(cache_key, value, created_at) "
+                        "VALUES (?, ?, strftime('%s', 'now'))",
+                        [(key, json.dumps(self._serialize_cache_value(value)))
+                         for key, value in dict(self.cache).items()],
+                    )
+                self._cache_db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.logger.error("Failed to save cache: %s", e)
+
     def load_cache(self, filepath: str):
-        """Load cache from file."""
+        """Open the persistent cache and warm the in-memory layer from it.
+
+        Entries are loaded oldest-first so the LRU cap keeps the most
+        recently written rows.
+        """
         try:
-            if os.path.exists(filepath):
-                with open(filepath, 'r') as f:
-                    self.cache = json.load(f)
+            with self._cache_db_lock:
+                self._cache_db = self._open_cache_db(filepath)
+                rows = self._cache_db.execute(
+                    "SELECT cache_key, value FROM enhancement_cache "
+                    "ORDER BY created_at"
+                ).fetchall()
+            self.cache = OrderedDict(
+                (key, self._deserialize_cache_value(json.loads(value)))
+                for key, value in rows
+            )
+            # Respect the cap on reload too, dropping the oldest entries
+            max_entries = self.config.cache_max_entries
+            if max_entries > 0:
+                while len(self.cache) > max_entries:
+                    self.cache.popitem(last=False)
         except Exception as e:
-            self.logger.error(f"Failed to load cache: {e}") 
\ No newline at end of file
+            self.logger.error("Failed to load cache: %s", e)
+
+@functools.lru_cache(maxsize=1)
+def get_enhancer(config: Config) -> TranscriptEnhancer:
+    """Return a shared TranscriptEnhancer for the given config.
+
+    Constructing an enhancer builds the Anthropic clients and their httpx
+    connection pools, so per-call construction throws away warm keepalive
+    connections. Config is a frozen dataclass and therefore hashable, which
+    lets it serve directly as the cache key; a different config builds a
+    fresh enhancer.
+    """
+    return TranscriptEnhancer(config)
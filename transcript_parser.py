@@ -3,18 +3,66 @@ Transcript parser module for YouTube Presentation Extractor
 Handles subtitle files and transcript synchronization
 """
 
+import mmap
 import re
-import json
+from functools import lru_cache
+from itertools import chain
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
+import numpy as np
 import srt
 from datetime import timedelta
 
+from config import json_loads
 
-@dataclass
+# One subtitle cue: a timestamp line followed by text running to the next
+# blank line. Matches both VTT (dot millis, optional cue settings after the
+# timestamps) and SRT (comma millis); headers, NOTE blocks and SRT index
+# lines sit outside cue blocks and simply never match
+_CUE_RE = re.compile(
+    rb'(\d+):(\d{2}):(\d{2})[.,](\d+)[ \t]*-->[ \t]*(\d+):(\d{2}):(\d{2})[.,](\d+)[^\n]*\n'
+    rb'(.*?)(?=\r?\n\r?\n|\Z)',
+    re.DOTALL,
+)
+
+# Standalone HH:MM:SS timestamp with optional milliseconds (dot or comma)
+_TS_RE = re.compile(r'(\d+):(\d+):(\d+)(?:[.,](\d+))?')
+
+# Subtitle artifacts ([music], (applause)) and whitespace runs, fused into
+# one alternation so clean_text scans each string once instead of three times
+_CLEAN_RE = re.compile(r'\[[^\]]*\]|\([^)]*\)|\s+')
+
+
+def _clean_repl(match: re.Match) -> str:
+    """Collapse whitespace runs to a space, drop bracketed artifacts."""
+    return ' ' if match.group()[0].isspace() else ''
+
+
+@lru_cache(maxsize=8192)
+def _clean_text_cached(text: str) -> str:
+    """Memoized clean_text body: the same segment texts are re-cleaned by
+    get_full_transcript and each downstream save, so repeats are common."""
+    return _CLEAN_RE.sub(_clean_repl, text).strip()
+
+
+@lru_cache(maxsize=None)
+def _fmt_ts(seconds: int) -> str:
+    """Format whole seconds as HH:MM:SS (memoized; integer keys so float
+    jitter cannot defeat the cache)."""
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+@dataclass(slots=True)
 class TranscriptSegment:
-    """Represents a segment of transcript text."""
+    """Represents a segment of transcript text.
+
+    slots=True drops the per-instance __dict__, which matters when a long
+    video yields tens of thousands of cue segments. Not frozen: enhancement
+    results are written back into existing segments in place.
+    """
     start_time: float
     end_time: float
     text: str
@@ -38,6 +86,14 @@ class TranscriptParser:
         self.segments = []
         self.language = "en"
         self.enhancement_stats = {}  # Store enhancement statistics
+        # Sorted start/end time arrays for binary-search lookups; rebuilt
+        # lazily after each parse (see _time_index)
+        self._starts = None
+        self._ends = None
+        # Parallel text/enhanced-text columns for vectorized reductions;
+        # rebuilt lazily after each parse or enhancement pass (see _text_columns)
+        self._txt_col = None
+        self._enh_col = None
     
     def set_enhanced_segments(self, enhanced_results: List) -> None:
         """
@@ -56,6 +112,8 @@ class TranscriptParser:
                 self.segments[i].enhanced_text = result.enhanced_text
                 self.segments[i].key_points = result.key_points
                 self.segments[i].summary = result.summary
+
+        self._txt_col = None
     
     def get_enhanced_text_for_timestamp(self, timestamp: float, window: float = 5.0) -> str:
         """
@@ -94,12 +152,7 @@ class TranscriptParser:
             List of key points
         """
         segments = self.get_segments_for_timestamp(timestamp, window)
-        key_points = []
-        
-        for segment in segments:
-            key_points.extend(segment.key_points)
-        
-        return key_points
+        return list(chain.from_iterable(seg.key_points for seg in segments))
     
     def get_enhanced_segments_in_range(self, start_time: float, end_time: float) -> List[TranscriptSegment]:
         """
@@ -122,28 +175,45 @@ class TranscriptParser:
         
         return enhanced_segments
     
+    def _text_columns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return cached text/enhanced-text columns as object arrays.
+
+        Pulling the strings out of the segment objects once lets the
+        enhancement reductions below run as elementwise array comparisons
+        instead of per-segment attribute lookups on every call.
+        """
+        if self._txt_col is None:
+            self._txt_col = np.array([seg.text for seg in self.segments], dtype=object)
+            self._enh_col = np.array([seg.enhanced_text for seg in self.segments], dtype=object)
+        return self._txt_col, self._enh_col
+
+    def _enhanced_mask(self) -> np.ndarray:
+        """Boolean mask of segments carrying non-trivial enhanced text."""
+        txt, enh = self._text_columns()
+        return (enh != txt) & (enh != '')
+
     def has_enhanced_content(self) -> bool:
         """
         Check if any segments have enhanced content.
-        
+
         Returns:
             True if enhanced content exists
         """
-        return any(seg.enhanced_text and seg.enhanced_text != seg.text for seg in self.segments)
-    
+        if not self.segments:
+            return False
+        return bool(self._enhanced_mask().any())
+
     def get_enhancement_coverage(self) -> float:
         """
         Get the percentage of segments that have enhanced content.
-        
+
         Returns:
             Percentage of enhanced segments (0.0 to 1.0)
         """
         if not self.segments:
             return 0.0
-        
-        enhanced_count = sum(1 for seg in self.segments 
-                           if seg.enhanced_text and seg.enhanced_text != seg.text)
-        return enhanced_count / len(self.segments)
+
+        return float(self._enhanced_mask().mean())
     
     def load_subtitles(self, subtitle_files: List[str]) -> bool:
         """
@@ -158,9 +228,13 @@ class TranscriptParser:
         if not subtitle_files:
             return False
         
-        # Prefer manual captions over auto-generated ones
-        manual_files = [f for f in subtitle_files if "manual" in f.lower() or not any(x in f.lower() for x in ["auto", "generated"])]
-        auto_files = [f for f in subtitle_files if any(x in f.lower() for x in ["auto", "generated"])]
+        # Prefer manual captions over auto-generated ones. Lowercase each
+        # path once instead of re-lowering it for every keyword test
+        lowered = [(f, f.lower()) for f in subtitle_files]
+        auto_keywords = ("auto", "generated")
+        manual_files = [f for f, lc in lowered
+                        if "manual" in lc or not any(k in lc for k in auto_keywords)]
+        auto_files = [f for f, lc in lowered if any(k in lc for k in auto_keywords)]
         
         # Try manual captions first
         for file_path in manual_files:
@@ -195,73 +269,82 @@ class TranscriptParser:
             print(f"Error parsing subtitle file {file_path}: {e}")
             return False
     
+    def _parse_cue_bytes(self, file_path: Path) -> bool:
+        """Parse timestamped cues straight from a memory-mapped file.
+
+        mmap plus a precompiled bytes regex avoids copying a multi-megabyte
+        subtitle file into a Python str up front; only the matched text
+        spans are decoded. Cue text lines are joined with single spaces,
+        matching how multi-line cues were assembled before.
+
+        The scan itself runs inside CPython's C regex engine — the
+        interpreter is only entered once per cue, not per byte — so this
+        stays a pure-Python module with near-native parsing speed.
+        """
+        segments = []
+        with open(file_path, 'rb') as fh:
+            try:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file
+                return False
+
+            try:
+                for match in _CUE_RE.finditer(mm):
+                    start_time = (int(match.group(1)) * 3600
+                                  + int(match.group(2)) * 60
+                                  + int(match.group(3))
+                                  + int(match.group(4)) / 10 ** len(match.group(4)))
+                    end_time = (int(match.group(5)) * 3600
+                                + int(match.group(6)) * 60
+                                + int(match.group(7))
+                                + int(match.group(8)) / 10 ** len(match.group(8)))
+                    text = ' '.join(match.group(9).decode('utf-8', 'replace').split())
+
+                    segments.append(TranscriptSegment(
+                        start_time=start_time,
+                        end_time=end_time,
+                        text=text
+                    ))
+            finally:
+                mm.close()
+
+        self.segments = segments
+        self._starts = None
+        self._txt_col = None
+        return len(segments) > 0
+
     def _parse_srt_file(self, file_path: Path) -> bool:
         """Parse SRT subtitle file."""
         try:
+            if self._parse_cue_bytes(file_path):
+                return True
+
+            # Fall back to the srt library for files the cue regex can't read
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Parse SRT content
-            subs = list(srt.parse(content))
-            
-            self.segments = []
-            for sub in subs:
-                segment = TranscriptSegment(
+                subs = list(srt.parse(f.read()))
+
+            self.segments = [
+                TranscriptSegment(
                     start_time=sub.start.total_seconds(),
                     end_time=sub.end.total_seconds(),
                     text=sub.content.strip()
                 )
-                self.segments.append(segment)
-            
+                for sub in subs
+            ]
+            self._starts = None
+            self._txt_col = None
+
             return len(self.segments) > 0
-            
+
         except Exception as e:
             print(f"Error parsing SRT file: {e}")
             return False
-    
+
     def _parse_vtt_file(self, file_path: Path) -> bool:
         """Parse VTT subtitle file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            self.segments = []
-            current_segment = None
-            
-            for line in lines:
-                line = line.strip()
-                
-                # Skip header and empty lines
-                if line == 'WEBVTT' or line == '' or line.startswith('NOTE'):
-                    continue
-                
-                # Parse timestamp line
-                if '-->' in line:
-                    if current_segment:
-                        self.segments.append(current_segment)
-                    
-                    start_str, end_str = line.split(' --> ')
-                    start_time = self._parse_timestamp(start_str)
-                    end_time = self._parse_timestamp(end_str)
-                    
-                    current_segment = TranscriptSegment(
-                        start_time=start_time,
-                        end_time=end_time,
-                        text=""
-                    )
-                
-                # Parse text line
-                elif current_segment is not None:
-                    if current_segment.text:
-                        current_segment.text += " "
-                    current_segment.text += line
-            
-            # Add last segment
-            if current_segment:
-                self.segments.append(current_segment)
-            
-            return len(self.segments) > 0
-            
+            return self._parse_cue_bytes(file_path)
         except Exception as e:
             print(f"Error parsing VTT file: {e}")
             return False
@@ -269,10 +352,14 @@ class TranscriptParser:
     def _parse_json_file(self, file_path: Path) -> bool:
         """Parse JSON subtitle file (YouTube format)."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
+            # json_loads routes through orjson when installed; auto-caption
+            # JSON can run to many megabytes, so the C parser pays off
+            with open(file_path, 'rb') as f:
+                data = json_loads(f.read())
+
             self.segments = []
+            self._starts = None
+            self._txt_col = None
             
             # Handle different JSON formats
             if 'events' in data:
@@ -309,47 +396,50 @@ class TranscriptParser:
             return False
     
     def _parse_timestamp(self, timestamp_str: str) -> float:
-        """Parse timestamp string to seconds."""
-        # Handle different timestamp formats
-        if '.' in timestamp_str:
-            # Format: HH:MM:SS.mmm
-            parts = timestamp_str.split(':')
-            hours = int(parts[0])
-            minutes = int(parts[1])
-            seconds_parts = parts[2].split('.')
-            seconds = int(seconds_parts[0])
-            milliseconds = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
-            
-            return hours * 3600 + minutes * 60 + seconds + milliseconds / 1000.0
-        else:
-            # Format: HH:MM:SS
-            parts = timestamp_str.split(':')
-            hours = int(parts[0])
-            minutes = int(parts[1])
-            seconds = int(parts[2])
-            
-            return hours * 3600 + minutes * 60 + seconds
+        """Parse timestamp string to seconds.
+
+        One precompiled match covers both HH:MM:SS and HH:MM:SS.mmm
+        (or ,mmm) instead of branching on '.' and splitting twice.
+        """
+        match = _TS_RE.match(timestamp_str)
+        if not match:
+            raise ValueError(f"Invalid timestamp: {timestamp_str!r}")
+
+        hours, minutes, seconds, millis = match.groups()
+        return (int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+                + (int(millis) / 1000.0 if millis else 0.0))
     
+    def _time_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return cached start/end time arrays for binary-search lookups.
+
+        Built once per parse and reused for every timestamp query; the
+        document generator performs one lookup per screenshot, so linear
+        scans over the segment list added up on long videos.
+        """
+        if self._starts is None:
+            n = len(self.segments)
+            self._starts = np.fromiter(
+                (seg.start_time for seg in self.segments), dtype=np.float64, count=n)
+            # Running maximum: end times of overlapping cues are not
+            # necessarily sorted, but their cumulative max is, which keeps
+            # searchsorted valid while still excluding everything that
+            # finished before the query window
+            self._ends = np.maximum.accumulate(np.fromiter(
+                (seg.end_time for seg in self.segments), dtype=np.float64, count=n))
+        return self._starts, self._ends
+
     def get_segments_for_timestamp(self, timestamp: float, window: float = 5.0) -> List[TranscriptSegment]:
         """
         Get transcript segments that overlap with a given timestamp.
-        
+
         Args:
             timestamp: Time in seconds
             window: Time window around timestamp to consider
-            
+
         Returns:
             List of overlapping transcript segments
         """
-        segments = []
-        
-        for segment in self.segments:
-            # Check if segment overlaps with timestamp
-            if (segment.start_time <= timestamp + window and 
-                segment.end_time >= timestamp - window):
-                segments.append(segment)
-        
-        return segments
+        return self.get_segments_in_range(timestamp - window, timestamp + window)
     
     def get_text_for_timestamp(self, timestamp: float, window: float = 5.0) -> str:
         """
@@ -369,9 +459,7 @@ class TranscriptParser:
         
         # Sort by start time and combine text
         segments.sort(key=lambda x: x.start_time)
-        text_parts = [seg.text for seg in segments]
-        
-        return " ".join(text_parts)
+        return " ".join(seg.text for seg in segments)
     
     def get_segments_in_range(self, start_time: float, end_time: float) -> List[TranscriptSegment]:
         """
@@ -384,45 +472,47 @@ class TranscriptParser:
         Returns:
             List of transcript segments in range
         """
-        segments = []
-        
-        for segment in self.segments:
-            if (segment.start_time <= end_time and 
-                segment.end_time >= start_time):
-                segments.append(segment)
-        
-        return segments
+        if not self.segments:
+            return []
+
+        # Cues are chronological, so two binary searches bound the segments
+        # that can overlap [start_time, end_time]: everything before lo
+        # already ended and everything from hi onwards has not started. The
+        # filter re-checks the (small) candidate slice exactly
+        starts, ends = self._time_index()
+        lo = int(np.searchsorted(ends, start_time, side='left'))
+        hi = int(np.searchsorted(starts, end_time, side='right'))
+
+        return [segment for segment in self.segments[lo:hi]
+                if segment.start_time <= end_time and segment.end_time >= start_time]
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize transcript text."""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove common subtitle artifacts
-        text = re.sub(r'\[.*?\]', '', text)  # Remove bracketed text
-        text = re.sub(r'\(.*?\)', '', text)  # Remove parenthetical text
-        
-        # Clean up punctuation
-        text = text.strip()
-        
-        return text
+        return _clean_text_cached(text)
     
     def get_full_transcript(self) -> str:
         """Get the complete transcript text."""
         if not self.segments:
             return ""
-        
-        text_parts = [self.clean_text(seg.text) for seg in self.segments]
-        return " ".join(text_parts)
+
+        return " ".join(self.clean_text(seg.text) for seg in self.segments)
     
     def get_statistics(self) -> Dict:
         """Get transcript statistics."""
         if not self.segments:
             return {}
-        
-        total_duration = max(seg.end_time for seg in self.segments)
-        total_words = sum(len(seg.text.split()) for seg in self.segments)
-        
+
+        # Subtitle cues are chronological by construction, so the last
+        # segment ends the transcript — no scan needed for the duration.
+        # Words are counted from space positions in one pass instead of
+        # allocating a split list per segment; parsed text is joined with
+        # single spaces, so the counts match len(text.split())
+        total_duration = self.segments[-1].end_time
+        txt, _ = self._text_columns()
+        total_words = int(np.fromiter(
+            (t.count(' ') + 1 if t else 0 for t in txt),
+            dtype=np.int64, count=len(txt)).sum())
+
         return {
             'total_segments': len(self.segments),
             'total_duration': total_duration,
@@ -444,27 +534,32 @@ class TranscriptParser:
             return False
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write("Original Transcript with Timestamps\n")
-                f.write("=" * 50 + "\n\n")
-                
-                for i, segment in enumerate(self.segments, 1):
-                    start_time = self._format_timestamp(segment.start_time)
-                    end_time = self._format_timestamp(segment.end_time)
-                    
-                    f.write(f"Segment {i} [{start_time} - {end_time}]\n")
-                    f.write(f"{segment.text}\n\n")
-                
-                # Add statistics
-                stats = self.get_statistics()
-                f.write("\n" + "=" * 50 + "\n")
-                f.write(f"Total segments: {stats.get('total_segments', 0)}\n")
-                f.write(f"Total words: {stats.get('total_words', 0)}\n")
-                f.write(f"Duration: {stats.get('duration', 0):.2f} seconds\n")
-            
+            # Assemble the whole document in memory and write it once
+            # instead of issuing a few syscalls per segment
+            parts = ["Original Transcript with Timestamps\n",
+                     "=" * 50 + "\n\n"]
+
+            for i, segment in enumerate(self.segments, 1):
+                start_time = self._format_timestamp(segment.start_time)
+                end_time = self._format_timestamp(segment.end_time)
+
+                parts.append(f"Segment {i} [{start_time} - {end_time}]\n"
+                             f"{segment.text}\n\n")
+
+            # Add statistics
+            stats = self.get_statistics()
+            parts.append("\n" + "=" * 50 + "\n")
+            parts.append(f"Total segments: {stats.get('total_segments', 0)}\n")
+            parts.append(f"Total words: {stats.get('total_words', 0)}\n")
+            parts.append(f"Duration: {stats.get('total_duration', 0):.2f} seconds\n")
+
+            # 1 MB buffer so multi-MB transcripts go out in a few syscalls
+            with open(output_path, 'w', buffering=1 << 20, encoding='utf-8') as f:
+                f.write(''.join(parts))
+
             print(f"Original transcript saved to: {output_path}")
             return True
-            
+
         except Exception as e:
             print(f"Error saving transcript: {e}")
             return False
@@ -483,49 +578,53 @@ class TranscriptParser:
             return False
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write("Enhanced Transcript with Timestamps\n")
-                f.write("=" * 50 + "\n\n")
-                
-                for i, segment in enumerate(self.segments, 1):
-                    start_time = self._format_timestamp(segment.start_time)
-                    end_time = self._format_timestamp(segment.end_time)
-                    
-                    f.write(f"Segment {i} [{start_time} - {end_time}]\n")
-                    
-                    # Write enhanced text if available, otherwise original
-                    if segment.enhanced_text and segment.enhanced_text != segment.text:
-                        f.write(f"Enhanced: {segment.enhanced_text}\n")
-                        f.write(f"Original: {segment.text}\n")
-                        
-                        # Add key points if available
-                        if segment.key_points:
-                            f.write("Key Points:\n")
-                            for point in segment.key_points:
-                                f.write(f"  - {point}\n")
-                    else:
-                        f.write(f"{segment.text}\n")
-                    
-                    f.write("\n")
-                
-                # Add enhancement statistics
-                enhanced_count = sum(1 for seg in self.segments 
-                                   if seg.enhanced_text and seg.enhanced_text != seg.text)
-                f.write("\n" + "=" * 50 + "\n")
-                f.write(f"Total segments: {len(self.segments)}\n")
-                f.write(f"Enhanced segments: {enhanced_count}\n")
-                f.write(f"Enhancement coverage: {(enhanced_count/len(self.segments)*100):.1f}%\n")
-            
+            # Assemble the whole document in memory and write it once
+            # instead of issuing a few syscalls per segment
+            parts = ["Enhanced Transcript with Timestamps\n",
+                     "=" * 50 + "\n\n"]
+            enhanced_count = 0
+
+            for i, segment in enumerate(self.segments, 1):
+                start_time = self._format_timestamp(segment.start_time)
+                end_time = self._format_timestamp(segment.end_time)
+
+                parts.append(f"Segment {i} [{start_time} - {end_time}]\n")
+
+                # Write enhanced text if available, otherwise original
+                if segment.enhanced_text and segment.enhanced_text != segment.text:
+                    enhanced_count += 1
+                    parts.append(f"Enhanced: {segment.enhanced_text}\n")
+                    parts.append(f"Original: {segment.text}\n")
+
+                    # Add key points if available
+                    if segment.key_points:
+                        parts.append("Key Points:\n")
+                        for point in segment.key_points:
+                            parts.append(f"  - {point}\n")
+                else:
+                    parts.append(f"{segment.text}\n")
+
+                parts.append("\n")
+
+            # Add enhancement statistics
+            parts.append("\n" + "=" * 50 + "\n")
+            parts.append(f"Total segments: {len(self.segments)}\n")
+            parts.append(f"Enhanced segments: {enhanced_count}\n")
+            parts.append(f"Enhancement coverage: {(enhanced_count/len(self.segments)*100):.1f}%\n")
+
+            # 1 MB buffer so multi-MB transcripts go out in a few syscalls
+            with open(output_path, 'w', buffering=1 << 20, encoding='utf-8') as f:
+                f.write(''.join(parts))
+
             print(f"Enhanced transcript saved to: {output_path}")
             return True
-            
+
         except Exception as e:
             print(f"Error saving enhanced transcript: {e}")
             return False
     
     def _format_timestamp(self, seconds: float) -> str:
         """Format seconds to HH:MM:SS format."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}" 
\ No newline at end of file
+        # Each segment boundary is formatted twice per save (and again on
+        # every re-save); the memoized helper makes repeats a dict lookup
+        return _fmt_ts(int(seconds)) 
\ No newline at end of file
@@ -3,7 +3,9 @@ Video processing module for YouTube Presentation Extractor
 Handles video download, frame extraction, and metadata extraction
 """
 
+import concurrent.futures
 import os
+import shutil
 import tempfile
 import subprocess
 import json
@@ -13,12 +15,25 @@ import cv2
 import numpy as np
 from pathlib import Path
 
-from config import Config
+from config import Config, json_loads
 
+# yt-dlp errors no retry with reduced subtitle flags can fix; bail out
+# instead of burning two more timeout windows on doomed attempts
+_FATAL_YTDLP_ERRORS = (
+    "Video unavailable",
+    "Private video",
+    "This video is not available",
+    "Sign in to confirm",
+)
 
-@dataclass
+
+@dataclass(slots=True)
 class VideoMetadata:
-    """Container for video metadata."""
+    """Container for video metadata.
+
+    slots=True drops the per-instance __dict__ and speeds attribute
+    access, matching TranscriptSegment.
+    """
     title: str
     duration: float
     width: int
@@ -91,76 +106,61 @@ class VideoProcessor:
         }
         
         format_spec = quality_map.get(self.config.video_quality, "best[height<=720]")
-        
-        # Enhanced yt-dlp command with better subtitle handling
-        cmd = [
-            "yt-dlp",
-            "--format", format_spec,
-            "--write-info-json",
-            "--write-subs",
-            "--write-auto-subs",
-            "--sub-format", "srt",
-            "--sub-lang", "en,en-US,en-GB",  # Try multiple English variants
-            "--convert-subs", "srt",  # Convert all subtitles to SRT
-            "--output", output_template,
-            youtube_url
+
+        # Download fragments in parallel; single-connection HTTP leaves
+        # most of the link idle on long videos. When aria2c is installed,
+        # hand the transfer to it for multi-connection segmented download
+        speed_flags = []
+        if self.config.download_workers:
+            speed_flags += ["--concurrent-fragments", str(self.config.download_workers)]
+        if shutil.which("aria2c"):
+            speed_flags += ["--downloader", "aria2c",
+                            "--downloader-args", "aria2c:-x16 -s16 -k1M"]
+
+        # Progressively reduced subtitle handling: full (auto subs, English
+        # variants, SRT conversion), then manual subs only, then video-only
+        subtitle_flag_sets = [
+            ["--write-subs", "--write-auto-subs", "--sub-format", "srt",
+             "--sub-lang", "en,en-US,en-GB", "--convert-subs", "srt"],
+            ["--write-subs", "--sub-format", "srt"],
+            [],
         ]
-        
+
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.config.timeout * 2
-            )
-            
-            if result.returncode != 0:
-                print(f"First attempt failed: {result.stderr}")
-                print("Trying with fallback options...")
-                
-                # Fallback command with more basic options
-                fallback_cmd = [
+            for attempt, sub_flags in enumerate(subtitle_flag_sets):
+                cmd = [
                     "yt-dlp",
+                    *speed_flags,
                     "--format", format_spec,
                     "--write-info-json",
-                    "--write-subs",
-                    "--sub-format", "srt",
+                    *sub_flags,
                     "--output", output_template,
                     youtube_url
                 ]
-                
+
                 result = subprocess.run(
-                    fallback_cmd,
+                    cmd,
                     capture_output=True,
                     text=True,
                     timeout=self.config.timeout * 2
                 )
-                
-                if result.returncode != 0:
-                    print(f"Fallback attempt failed: {result.stderr}")
-                    print("Trying with minimal options...")
-                    
-                    # Minimal command - just get the video
-                    minimal_cmd = [
-                        "yt-dlp",
-                        "--format", format_spec,
-                        "--write-info-json",
-                        "--output", output_template,
-                        youtube_url
-                    ]
-                    
-                    result = subprocess.run(
-                        minimal_cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=self.config.timeout * 2
-                    )
-                    
-                    if result.returncode != 0:
-                        raise Exception(f"yt-dlp failed: {result.stderr}")
-                    else:
+
+                if result.returncode == 0:
+                    if not sub_flags:
                         print("Warning: Downloaded video but no subtitles found")
-            
+                    break
+
+                if any(sig in result.stderr for sig in _FATAL_YTDLP_ERRORS):
+                    # Simpler flags cannot make an unavailable video appear
+                    break
+
+                if attempt < len(subtitle_flag_sets) - 1:
+                    print(f"Attempt {attempt + 1} failed: {result.stderr}")
+                    print("Trying with fallback options...")
+
+            if result.returncode != 0:
+                raise Exception(f"yt-dlp failed: {result.stderr}")
+
             # Find the downloaded video file
             video_files = list(Path(self.temp_dir).glob("*.mp4"))
             if not video_files:
@@ -183,16 +183,13 @@ class VideoProcessor:
         if not json_files:
             raise Exception("No metadata file found")
         
-        with open(json_files[0], 'r', encoding='utf-8') as f:
-            info = json.load(f)
-        
-        # Get video properties using OpenCV
-        cap = cv2.VideoCapture(self.video_path)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        cap.release()
-        
+        # json_loads routes through orjson when installed; description-heavy
+        # info.json files reach megabytes
+        with open(json_files[0], 'rb') as f:
+            info = json_loads(f.read())
+
+        width, height, fps = self._probe_video_properties()
+
         return VideoMetadata(
             title=info.get('title', 'Unknown'),
             duration=info.get('duration', 0),
@@ -203,59 +200,267 @@ class VideoProcessor:
             upload_date=info.get('upload_date', ''),
             description=info.get('description', '')
         )
-    
+
+    def _probe_video_properties(self) -> Tuple[int, int, float]:
+        """Return (width, height, fps) for the downloaded video.
+
+        ffprobe reads the container header without bringing up a decoder,
+        which is noticeably cheaper than opening a cv2.VideoCapture just
+        to read three properties (frame extraction opens its own capture
+        later anyway). Falls back to OpenCV when ffprobe is unavailable.
+        """
+        try:
+            result = subprocess.run(
+                ["ffprobe", "-v", "error", "-select_streams", "v:0",
+                 "-show_entries", "stream=width,height,r_frame_rate",
+                 "-of", "json", self.video_path],
+                capture_output=True, text=True, timeout=self.config.timeout
+            )
+            if result.returncode == 0:
+                stream = json.loads(result.stdout)["streams"][0]
+                # r_frame_rate is a rational like "30000/1001"
+                num, _, den = stream["r_frame_rate"].partition('/')
+                fps = float(num) / float(den or 1)
+                return int(stream["width"]), int(stream["height"]), fps
+        except (OSError, subprocess.TimeoutExpired, KeyError, IndexError,
+                ValueError, ZeroDivisionError):
+            pass
+
+        cap = cv2.VideoCapture(self.video_path)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        return width, height, fps
+
     def extract_frames(self, start_time: float = 0, end_time: Optional[float] = None) -> List[Tuple[float, np.ndarray]]:
         """
         Extract frames from video at specified intervals.
-        
+
+        Materializes every frame; prefer iter_frames for streaming
+        consumers, where peak memory stays at one frame regardless of
+        video length.
+
         Args:
             start_time: Start time in seconds
             end_time: End time in seconds (None for end of video)
-            
+
         Returns:
             List of (timestamp, frame) tuples
         """
+        return list(self.iter_frames(start_time, end_time))
+
+    def iter_frames(self, start_time: float = 0, end_time: Optional[float] = None):
+        """
+        Yield (timestamp, frame) tuples at the configured sampling rate.
+
+        A generator instead of a list: an hour of video at 1 fps and
+        1080p held as a list is tens of gigabytes, while every consumer
+        processes one frame at a time anyway. The capture is released
+        when the generator is exhausted or closed.
+
+        Args:
+            start_time: Start time in seconds
+            end_time: End time in seconds (None for end of video)
+
+        Yields:
+            (timestamp, frame) tuples
+        """
         if not self.video_path:
             raise Exception("No video loaded. Call download_video() first.")
-        
-        frames = []
+
+        if self.config.extraction_workers > 1:
+            yield from self._iter_frames_sharded(start_time, end_time)
+            return
+
         cap = cv2.VideoCapture(self.video_path)
         
         if not cap.isOpened():
             raise Exception("Could not open video file")
         
-        # Set start position
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-        
-        frame_interval = 1.0 / self.config.frame_rate
-        current_time = start_time
-        
+        src_fps = cap.get(cv2.CAP_PROP_FPS)
+        if src_fps <= 0:
+            src_fps = self.metadata.fps if self.metadata and self.metadata.fps > 0 else 30.0
+
+        # Decode forward and skip the frames between samples with grab()
+        # (demux only, no decode) instead of re-seeking per sample. A seek
+        # lands on the nearest keyframe and re-decodes the whole GOP, so
+        # at 1 fps sampling most of that decode work produced frames that
+        # were thrown away
+        skip = max(1, int(round(src_fps / self.config.frame_rate)))
+        frame_idx = int(round(start_time * src_fps))
+
+        # One frame-exact seek to the start; POS_MSEC rounds through the
+        # container timebase and can land a frame off, which would shift
+        # every yielded frame_idx/src_fps timestamp
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+
         if end_time is None:
             end_time = self.metadata.duration
-        
+        end_idx = int(round(end_time * src_fps))
+
         print(f"Extracting frames from {start_time:.2f}s to {end_time:.2f}s...")
-        
+
+        extracted = 0
         try:
-            while current_time < end_time:
-                cap.set(cv2.CAP_PROP_POS_MSEC, current_time * 1000)
+            while frame_idx < end_idx:
                 ret, frame = cap.read()
-                
+
                 if not ret:
                     break
-                
-                # Resize frame if target resolution is specified
+
+                # Resize frame if target resolution is specified. INTER_AREA
+                # matches ffmpeg's scale=...:flags=area: it is the right
+                # kernel for downscaling and skips the smoothing work the
+                # default bilinear filter wastes on shrinks. Frames already
+                # at the target size pass through untouched
                 if self.config.target_resolution:
-                    frame = cv2.resize(frame, self.config.target_resolution)
-                
-                frames.append((current_time, frame))
-                current_time += frame_interval
-                
+                    if (frame.shape[1], frame.shape[0]) != self.config.target_resolution:
+                        frame = cv2.resize(frame, self.config.target_resolution,
+                                           interpolation=cv2.INTER_AREA)
+
+                yield frame_idx / src_fps, frame
+                extracted += 1
+
+                frame_idx += skip
+                for _ in range(skip - 1):
+                    if not cap.grab():
+                        break
+
         finally:
             cap.release()
-        
-        print(f"Extracted {len(frames)} frames")
+
+        print(f"Extracted {extracted} frames")
+
+    def _iter_frames_sharded(self, start_time: float, end_time: Optional[float]):
+        """Extract frames in parallel over contiguous time shards.
+
+        Video decode is embarrassingly parallel across disjoint ranges:
+        each worker owns its own VideoCapture (OpenCV releases the GIL in
+        read/grab), seeks once to its shard start, and runs the same
+        sequential grab/retrieve loop. Shard boundaries are aligned to the
+        sampling stride so the yielded (timestamp, frame) sequence is
+        identical to the single-threaded path, just produced faster. Each
+        shard is materialized before it is yielded, so peak memory grows
+        with extraction_workers — the default of 1 keeps the one-frame
+        streaming behavior.
+        """
+        src_fps = self.metadata.fps if self.metadata and self.metadata.fps > 0 else 30.0
+        if end_time is None:
+            end_time = self.metadata.duration
+
+        skip = max(1, int(round(src_fps / self.config.frame_rate)))
+        start_idx = int(round(start_time * src_fps))
+        end_idx = int(round(end_time * src_fps))
+
+        workers = self.config.extraction_workers
+        samples = max(0, end_idx - start_idx + skip - 1) // skip
+        per_shard = max(1, -(-samples // workers))  # ceil division
+
+        shards = []
+        lo = start_idx
+        while lo < end_idx:
+            hi = min(lo + per_shard * skip, end_idx)
+            shards.append((lo, hi))
+            lo = hi
+
+        print(f"Extracting frames from {start_time:.2f}s to {end_time:.2f}s "
+              f"({len(shards)} shards, {workers} workers)...")
+
+        extracted = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._extract_shard, lo, hi, skip, src_fps)
+                       for lo, hi in shards]
+            # Consume in shard order to preserve global timestamp ordering
+            for future in futures:
+                frames = future.result()
+                extracted += len(frames)
+                yield from frames
+
+        print(f"Extracted {extracted} frames")
+
+    def _extract_shard(self, start_idx: int, end_idx: int, skip: int,
+                       src_fps: float) -> List[Tuple[float, np.ndarray]]:
+        """Decode one [start_idx, end_idx) frame-index shard with its own capture."""
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise Exception("Could not open video file")
+
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_idx)
+
+        frames = []
+        frame_idx = start_idx
+        try:
+            while frame_idx < end_idx:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                if self.config.target_resolution:
+                    if (frame.shape[1], frame.shape[0]) != self.config.target_resolution:
+                        frame = cv2.resize(frame, self.config.target_resolution,
+                                           interpolation=cv2.INTER_AREA)
+
+                frames.append((frame_idx / src_fps, frame))
+
+                frame_idx += skip
+                for _ in range(skip - 1):
+                    if not cap.grab():
+                        break
+        finally:
+            cap.release()
+
         return frames
-    
+
+    def frames_at(self, timestamps: List[float]) -> List[Tuple[float, np.ndarray]]:
+        """Decode the single frame nearest each requested timestamp.
+
+        Used for screenshots after streaming scene detection has consumed
+        the frame iterator: seeking straight to the handful of detected
+        scene changes is far cheaper than a second full decode pass, and
+        avoids holding every sampled frame in memory just in case.
+
+        Args:
+            timestamps: Times in seconds to grab frames for
+
+        Returns:
+            List of (timestamp, frame) tuples in ascending time order
+        """
+        if not self.video_path:
+            raise Exception("No video loaded. Call download_video() first.")
+        if not timestamps:
+            return []
+
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise Exception("Could not open video file")
+
+        src_fps = cap.get(cv2.CAP_PROP_FPS)
+        if src_fps <= 0:
+            src_fps = self.metadata.fps if self.metadata and self.metadata.fps > 0 else 30.0
+
+        frames = []
+        try:
+            # Visit timestamps in ascending order so the decoder only ever
+            # seeks forward
+            for ts in sorted(timestamps):
+                idx = max(0, int(round(ts * src_fps)))
+                cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+                ret, frame = cap.read()
+                if not ret:
+                    continue
+
+                if self.config.target_resolution:
+                    if (frame.shape[1], frame.shape[0]) != self.config.target_resolution:
+                        frame = cv2.resize(frame, self.config.target_resolution,
+                                           interpolation=cv2.INTER_AREA)
+
+                frames.append((idx / src_fps, frame))
+        finally:
+            cap.release()
+
+        return frames
+
     def get_subtitle_files(self) -> List[str]:
         """Get list of available subtitle files."""
         if not self.temp_dir:
@@ -270,7 +475,6 @@ class VideoProcessor:
     def cleanup(self):
         """Clean up temporary files."""
         if self.temp_dir and os.path.exists(self.temp_dir):
-            import shutil
             try:
                 shutil.rmtree(self.temp_dir)
                 print(f"Cleaned up temporary directory: {self.temp_dir}")